@@ -1,13 +1,17 @@
 """Album form."""
 
+from functools import partial
+
 from django import forms
-from django.db.models.signals import post_save
+from django.db import transaction
 
 from network.common.fields import MultipleFileField
 from network.common.mixins import MediaMixin
 from network.common.validators import validate_media_extension
+from network.posts.services import MediaIngestionService
 
-from .models import Album, AlbumMedia
+from .models import Album
+from .tasks import ingest_album_medias
 
 
 class AlbumForm(MediaMixin, forms.ModelForm):
@@ -20,27 +24,18 @@ class AlbumForm(MediaMixin, forms.ModelForm):
         fields = ["name"]
 
     def save_medias(self, album):
-        """Save valid uploaded media to album."""
+        """Stage valid uploaded media and enqueue their ingestion into the album."""
         medias = self.cleaned_data.get("medias")
 
         if medias:
-            max_order = self.get_max_order(album)
-            medias = AlbumMedia.objects.bulk_create(
-                [
-                    AlbumMedia(
-                        album=album,
-                        file=media,
-                        order=index,
-                        type=self.get_media_type(media),
-                    )
-                    for index, media in enumerate(medias, start=max_order + 1)
-                ]
+            staged = MediaIngestionService.stage(
+                [(media, self.get_media_type(media)) for media in medias]
             )
-            post_save.send(
-                sender=AlbumMedia,
-                instance=medias[0],
-                created=True,
-                using="default",
-                raw=False,
-                update_fields=None,
+            transaction.on_commit(
+                partial(
+                    ingest_album_medias.delay,
+                    str(album.id),
+                    album.profile.user_id,
+                    staged,
+                )
             )
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("albums", "0001_initial"),
+        ("profiles", "0018_alter_egg_user"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(
+                fields=["profile", "-created_at"], name="albums_albu_profile_0707df_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="albummedia",
+            index=models.Index(
+                fields=["album", "-created_at"], name="albums_albu_album_i_f31c2b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_album_medias_count_and_cover(apps, scheme_editor):
+    Album = apps.get_model("albums", "Album")
+    AlbumMedia = apps.get_model("albums", "AlbumMedia")
+
+    medias_count = (
+        AlbumMedia.objects.filter(album=OuterRef("pk"))
+        .order_by()
+        .values("album")
+        .annotate(count=Count("pkid"))
+        .values("count")
+    )
+    latest_media = (
+        AlbumMedia.objects.filter(album=OuterRef("pk"))
+        .order_by("-created_at")
+        .values("pkid")[:1]
+    )
+    Album.objects.update(
+        medias_count=Coalesce(Subquery(medias_count), 0),
+        cover_media=Subquery(latest_media),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("albums", "0002_album_albums_albu_profile_0707df_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="album",
+            name="cover_media",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="albums.albummedia",
+            ),
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="medias_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            populate_album_medias_count_and_cover,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
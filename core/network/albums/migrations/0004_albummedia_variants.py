@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("albums", "0003_album_medias_count_cover_media"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="albummedia",
+            name="variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,6 +1,8 @@
 """Album models."""
 
 from django.db import models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 
 from network.common.models import MediaBaseModel, TimestampedModel
 from network.profiles.models import Profile
@@ -14,6 +16,47 @@ class Album(TimestampedModel):
     profile = models.ForeignKey(
         Profile, on_delete=models.CASCADE, related_name="albums"
     )
+    medias_count = models.PositiveIntegerField(default=0)
+    cover_media = models.ForeignKey(
+        "AlbumMedia",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    class Meta(TimestampedModel.Meta):
+        indexes = [
+            models.Index(fields=["profile", "-created_at"]),
+        ]
+
+    def add_medias(self, medias):
+        """
+        Count newly created medias and make the latest one the cover.
+
+        Call it in the same transaction that creates the medias.
+        """
+        Album.objects.filter(pk=self.pk).update(
+            medias_count=F("medias_count") + len(medias), cover_media=medias[-1]
+        )
+        self.refresh_from_db(fields=["medias_count", "cover_media"])
+
+    def remove_medias(self, count):
+        """
+        Uncount deleted medias and, if the cover was deleted, cover the latest media left.
+
+        Call it in the same transaction that deletes the medias.
+        """
+        latest_media = (
+            AlbumMedia.objects.filter(album=OuterRef("pk"))
+            .order_by("-created_at")
+            .values("pkid")[:1]
+        )
+        Album.objects.filter(pk=self.pk).update(
+            medias_count=Greatest(F("medias_count") - count, 0),
+            cover_media=Coalesce(F("cover_media"), Subquery(latest_media)),
+        )
+        self.refresh_from_db(fields=["medias_count", "cover_media"])
 
 
 class AlbumMedia(MediaBaseModel):
@@ -27,6 +70,9 @@ class AlbumMedia(MediaBaseModel):
                 fields=["album", "order"], name="Unique order per album."
             )
         ]
+        indexes = [
+            models.Index(fields=["album", "-created_at"]),
+        ]
 
     def __str__(self) -> str:
         """Return string "Media Type: {self.type}. Order: {self.order}. From post: {self.post.pkid}."""
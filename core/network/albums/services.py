@@ -0,0 +1,42 @@
+"""Album services."""
+
+from django.db.models import Max
+from django.db.models.signals import post_save
+
+from network.common.services import MediaVariantService
+from network.posts.services import MediaIngestionService
+
+from .models import Album, AlbumMedia
+
+
+class AlbumMediaService:
+    """Service for saving medias of an album."""
+
+    @staticmethod
+    def ingest(album_id, user_pkid, staged):
+        """Save staged uploads as medias of an album, see MediaIngestionService."""
+
+        def save_medias(files):
+            # Lock the album so concurrent saves allocate orders one after another
+            album = Album.objects.select_for_update().get(id=album_id)
+            max_order = album.medias.aggregate(max_order=Max("order"))["max_order"] or 0
+            medias = AlbumMedia.objects.bulk_create(
+                [
+                    AlbumMedia(album=album, file=file, order=index, type=media_type)
+                    for index, (media_type, file) in enumerate(
+                        files, start=max_order + 1
+                    )
+                ]
+            )
+            album.add_medias(medias)
+            post_save.send(
+                sender=AlbumMedia,
+                instance=medias[0],
+                created=True,
+                using="default",
+                raw=False,
+                update_fields=None,
+            )
+            MediaVariantService.schedule(media for media in medias if media.is_image())
+
+        MediaIngestionService.ingest(user_pkid, staged, save_medias, album_id=album_id)
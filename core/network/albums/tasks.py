@@ -0,0 +1,11 @@
+"""Celery tasks for album apps."""
+
+from celery import shared_task
+
+
+@shared_task
+def ingest_album_medias(album_id, user_pkid, staged):
+    """Celery task to save staged uploads as medias of an album."""
+    from .services import AlbumMediaService
+
+    AlbumMediaService.ingest(album_id, user_pkid, staged)
@@ -2,7 +2,7 @@
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
-from django.db.models import Count
+from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import (
@@ -13,13 +13,17 @@ from django.views.generic import (
     UpdateView,
 )
 
-from network.common.mixins import SetOwnerProfileMixin, SetProfileContextMixin
+from network.common.mixins import (
+    CursorPaginationMixin,
+    SetOwnerProfileMixin,
+    SetProfileContextMixin,
+)
 
 from .forms import AlbumForm
 from .models import Album, AlbumMedia
 
 
-class AlbumsPaginateView(SetProfileContextMixin, ListView):
+class AlbumsPaginateView(SetProfileContextMixin, CursorPaginationMixin, ListView):
     """Album paginate view that handle partial albums paginate retreive."""
 
     template_name = "albums/album_paginator.html"
@@ -33,15 +37,12 @@ class AlbumsPaginateView(SetProfileContextMixin, ListView):
 
     def get_queryset(self):
         """Get albums owned by the profile."""
-        return (
-            Album.objects.filter(profile=self.profile)
-            .select_related("profile", "profile__user")
-            .prefetch_related("medias")
-            .annotate(medias_count=Count("medias"))
+        return Album.objects.filter(profile=self.profile).select_related(
+            "profile", "profile__user", "cover_media"
         )
 
 
-class AlbumMediasPaginatorView(ListView):
+class AlbumMediasPaginatorView(CursorPaginationMixin, ListView):
     """View to accesss any user's album list page."""
 
     context_object_name = "medias"
@@ -135,10 +136,17 @@ class AlbumUpdate(SetOwnerProfileMixin, LoginRequiredMixin, UpdateView):
         """Handle delete requested media and save new ones."""
         delete_ids = self.request.POST.getlist("delete_media")
         with transaction.atomic():
-            AlbumMedia.objects.filter(id__in=delete_ids).delete()
-            resp = super().form_valid(form)
+            deleted, _ = AlbumMedia.objects.filter(
+                id__in=delete_ids, album=self.object
+            ).delete()
+            if deleted:
+                self.object.remove_medias(deleted)
+            # Media count and cover are updated concurrently by media ingestion,
+            # so only write the edited fields back
+            self.object = form.save(commit=False)
+            self.object.save(update_fields=["name", "updated_at"])
             form.save_medias(self.object)
-        return resp
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class AlbumDeleteView(SetOwnerProfileMixin, LoginRequiredMixin, DeleteView):
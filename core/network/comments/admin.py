@@ -2,9 +2,14 @@
 
 from django.contrib import admin
 
+from network.common.pagination import CachedCountPaginator
+
 from .models import Comment
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     """Custom comment admin."""
+
+    paginator = CachedCountPaginator
+    show_full_result_count = False
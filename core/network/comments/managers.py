@@ -1,31 +1,43 @@
 """Comment custom manager."""
 
 from django.db import models
+from django.db.models.functions import RowNumber
 
 
 class CommentQuerySet(models.QuerySet):
     """Comment custom queryset."""
 
-    def prefetched_info_qs(self, user=None):
-        """Return all queryset with prefetched profile, children count and if it's liked by the requesting user."""
-        from .models import CommentLike
-
-        return (
-            self.select_related("user__profile")
-            .annotate(
-                liked_by_user=models.Exists(
-                    CommentLike.objects.filter(
-                        user=user, comment_id=models.OuterRef("pk")
-                    )
-                )
-            )
-            .annotate(children_count=models.Count("children"))
+    def prefetched_info_qs(self):
+        """Return all queryset with prefetched profile and children count."""
+        return self.select_related("user__profile").annotate(
+            children_count=models.Count("children")
         )
 
     def top_level_comment(self, post):
         """Fetch top level comments only."""
         return self.filter(post=post, parent__isnull=True)
 
+    def latest_top_level(self, post_pkids, per_post):
+        """
+        Filter to the latest per_post top level comments of each post.
+
+        The rows are picked by ROW_NUMBER() per post in a subquery, so
+        annotations of the outer queryset are only computed for the rows kept.
+        """
+        latest_pkids = (
+            self.model.objects.filter(post_id__in=post_pkids, parent__isnull=True)
+            .annotate(
+                row_number=models.Window(
+                    RowNumber(),
+                    partition_by=models.F("post_id"),
+                    order_by=models.F("created_at").desc(),
+                )
+            )
+            .filter(row_number__lte=per_post)
+            .values("pkid")
+        )
+        return self.filter(pkid__in=latest_pkids).order_by("-created_at")
+
 
 class CommentManager(models.Manager):
     """Comment custom manager."""
@@ -34,14 +46,22 @@ class CommentManager(models.Manager):
         """Return basic queryset."""
         return CommentQuerySet(model=self.model, using=self._db)
 
-    def prefetched_info_qs(self, user=None):
+    def prefetched_info_qs(self):
         """Return all queryset with Prefetched profile data and children."""
-        return self.get_queryset().prefetched_info_qs(user)
+        return self.get_queryset().prefetched_info_qs()
 
-    def top_level_comments(self, post, user=None):
+    def top_level_comments(self, post):
         """Return top level comment set with prefetched profile data."""
-        return self.get_queryset().prefetched_info_qs(user).top_level_comment(post)
+        return self.get_queryset().prefetched_info_qs().top_level_comment(post)
+
+    def latest_top_level(self, post_pkids, per_post):
+        """Return the latest per_post top level comments of each post with prefetched profile data."""
+        return (
+            self.get_queryset()
+            .prefetched_info_qs()
+            .latest_top_level(post_pkids, per_post)
+        )
 
-    def get_children(self, parent, user=None):
+    def get_children(self, parent):
         """Get parent comments."""
-        return self.get_queryset().prefetched_info_qs(user).filter(parent=parent)
+        return self.get_queryset().prefetched_info_qs().filter(parent=parent)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0003_comment_like_count"),
+        ("posts", "0025_remove_post_comment_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "-created_at"], name="comments_co_post_id_3d4abc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["parent", "-created_at"], name="comments_co_parent__2efacb_idx"
+            ),
+        ),
+    ]
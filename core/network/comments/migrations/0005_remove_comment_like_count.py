@@ -0,0 +1,16 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:22
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0004_comment_comments_co_post_id_3d4abc_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="comment",
+            name="like_count",
+        ),
+    ]
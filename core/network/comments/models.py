@@ -31,16 +31,15 @@ class Comment(ProfileInfoMixin, LikeCountMixin, TimestampedModel):
     objects = CommentManager()
 
     class Meta(TimestampedModel.Meta):
-        pass
+        indexes = [
+            models.Index(fields=["post", "-created_at"]),
+            models.Index(fields=["parent", "-created_at"]),
+        ]
 
     def __str__(self) -> str:
         """Return string: 'User: {self.user.id} comment on Post: {self.post.id}'."""
         return f"User: {self.user.id} comment on Post: {self.post.id}"
 
-    def set_liked_by_user(self, user):
-        """Set update-to-date liked by user for comment."""
-        self.liked_by_user = self.likes.filter(user=user).exists()
-
 
 class CommentLike(TimestampedModel):
     """Like model for comment."""
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from network.posts.services import PostCardCacheService
+
+from .models import Comment
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def bump_post_card_version(sender, instance, **kwargs):
+    PostCardCacheService.bump_versions([instance.post_id])
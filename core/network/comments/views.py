@@ -5,6 +5,8 @@ from django.db import transaction
 from django.shortcuts import get_object_or_404, render
 from django.views.generic import CreateView, ListView, UpdateView, View
 
+from network.common.mixins import CursorPaginationMixin
+from network.common.services import LikeService
 from network.posts.models import Post
 
 from .forms import CommentForm
@@ -34,7 +36,9 @@ class SetAssociatedPostContextMixin:
         return context
 
 
-class CommentPaginatedView(SetAssociatedPostContextMixin, ListView):
+class CommentPaginatedView(
+    SetAssociatedPostContextMixin, CursorPaginationMixin, ListView
+):
     """Comment Paginated list View."""
 
     context_object_name = "comments"
@@ -48,10 +52,13 @@ class CommentPaginatedView(SetAssociatedPostContextMixin, ListView):
 
     def get_queryset(self):
         """Get top level comments."""
-        return Comment.objects.top_level_comments(
-            post=self.post,
-            user=self.request.user,
-        )
+        return Comment.objects.top_level_comments(post=self.post)
+
+    def get_context_data(self, **kwargs):
+        """Attach like data of the page's comments."""
+        context = super().get_context_data(**kwargs)
+        LikeService.attach(context["comments"], self.request.user)
+        return context
 
 
 class CommentCreateView(
@@ -68,7 +75,7 @@ class CommentCreateView(
 
     def get_queryset(self):
         """Use prefetched info qs as base queryset."""
-        return Comment.objects.prefetched_info_qs(user=self.request.user)
+        return Comment.objects.prefetched_info_qs()
 
     def get_response(self):
         """Get partial response."""
@@ -107,7 +114,9 @@ class CommentCreateView(
         if parent_id:  # meaning it's replying to a parent comment
             form.instance.parent = get_object_or_404(Comment, id=parent_id)
 
-        self.object = form.save()
+        with transaction.atomic():
+            self.object = form.save()
+            self.post.update_comment_count(1)
 
         return self.get_response()
 
@@ -148,7 +157,10 @@ class CommentDeleteView(
         comment = self.get_object()
         post = comment.post
 
-        comment.delete()
+        with transaction.atomic():
+            # Replies are cascade deleted and counted in the same result
+            _, deleted = comment.delete()
+            post.update_comment_count(-deleted.get(Comment._meta.label, 0))  # noqa: SLF001
 
         context = {"post": post}
 
@@ -161,7 +173,9 @@ class CommentDeleteView(
 
 
 # TODO: make sure this query is optimized
-class CommentChildrenPaginatedView(SetAssociatedPostContextMixin, ListView):
+class CommentChildrenPaginatedView(
+    SetAssociatedPostContextMixin, CursorPaginationMixin, ListView
+):
     """Comment Children Partial response view."""
 
     context_object_name = "replies"
@@ -181,14 +195,12 @@ class CommentChildrenPaginatedView(SetAssociatedPostContextMixin, ListView):
         """Provide request in context for partial template."""
         context = super().get_context_data(**kwargs)
         context["comment"] = self.object  # parent comment
+        LikeService.attach(context["replies"], self.request.user)
         return context
 
     def get_queryset(self):
         """Return comment's children as queryset."""
-        return Comment.objects.get_children(
-            parent=self.object,
-            user=self.request.user,
-        )
+        return Comment.objects.get_children(parent=self.object)
 
 
 class LikeCommentView(LoginRequiredMixin, View):
@@ -197,16 +209,15 @@ class LikeCommentView(LoginRequiredMixin, View):
     template_name = "comments/like_count.html"
 
     def post(self, request, *args, **kwargs):
-        """Like the post and syncs with comment's like_count field."""
+        """Toggle like of the comment and return its like count."""
         comment = get_object_or_404(Comment, id=kwargs.get("comment_id"))
-        user = request.user
-        with transaction.atomic():
-            like, created = CommentLike.objects.get_or_create(
-                user=user, comment=comment
-            )
-            if not created:
-                like.delete()
-            comment.sync_like_count()
+
+        LikeService.toggle(
+            like_model=CommentLike,
+            target_field="comment",
+            target=comment,
+            user=request.user,
+        )
 
         context = {"comment": comment}
 
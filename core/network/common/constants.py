@@ -5,3 +5,20 @@ ALLOWED_POST_VIDEO_NUM = 1
 
 ALLOWED_POST_IMAGE_EXT = ["jpg", "jpeg", "png", "gif", "webp"]
 ALLOWED_POST_VIDEO_EXT = ["mp4", "avi", "mov", "mkv", "webm"]
+
+# Paginator counts
+ESTIMATED_COUNT_THRESHOLD = 100_000  # above this, use pg_class.reltuples estimate
+COUNT_CACHE_TIMEOUT = 60 * 60 * 24  # re-seed cached counts from db at least daily
+LIKE_COUNT_TIMEOUT = 60 * 60 * 24  # like counts are re-seeded from db daily
+LIKE_COUNT_TIMEOUT_JITTER = 60 * 60 * 6  # up to this much later, spreading re-seeds
+LIKED_SET_TIMEOUT = 60 * 60 * 24  # per-user liked sets are re-seeded from db daily
+
+# Random sampling
+SAMPLE_FETCH_WHOLE_FACTOR = (
+    4  # sets up to this many rows per requested row are fetched whole
+)
+SAMPLE_PROBE_ROUNDS = 3  # rounds re-probing for rows lost to duplicate or empty probes
+
+# Responsive media variants
+MEDIA_VARIANT_WIDTHS = [320, 640, 1080]  # WebP widths generated for uploaded images
+MEDIA_VARIANT_QUALITY = 80
@@ -0,0 +1,43 @@
+"""Request-scoped batch loaders."""
+
+
+class BatchLoader:
+    """
+    Loader resolving values of many keys with one batched query.
+
+    Views register the keys of the objects on a page, then template accessors
+    load them one by one. The first load resolves every registered key with a
+    single batch_fn(keys) call returning {key: value}, and keys missing from
+    the result resolve to the default. Keys neither registered nor loaded yet
+    cost one more batch, so a page makes one query per kind, not per row.
+    """
+
+    def __init__(self, batch_fn, default=None) -> None:
+        self.batch_fn = batch_fn
+        self.default = default
+        self.pending = set()
+        self.values = {}
+
+    def register(self, keys):
+        """Queue keys to be resolved by the next batch."""
+        self.pending.update(key for key in keys if key not in self.values)
+
+    def load(self, key):
+        """Return the value of a key, resolving all pending keys on a miss."""
+        if key not in self.values:
+            self.pending.add(key)
+            keys = list(self.pending)
+            self.pending.clear()
+
+            values = self.batch_fn(keys)
+            for pending_key in keys:
+                self.values[pending_key] = values.get(pending_key, self.default)
+        return self.values[key]
+
+
+def get_loader(request, name, batch_fn, default=None):
+    """Return the request's loader of the name, created on first use."""
+    loaders = request.__dict__.setdefault("batch_loaders", {})
+    if name not in loaders:
+        loaders[name] = BatchLoader(batch_fn, default)
+    return loaders[name]
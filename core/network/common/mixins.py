@@ -2,11 +2,20 @@
 
 import json
 
-from django.db.models import Max, Model, PositiveSmallIntegerField
+from django.db.models import F, Max, Model, PositiveIntegerField
+from django.db.models.functions import Greatest
 from django.forms import ValidationError
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
 from network.common.models import MediaBaseModel
+from network.common.pagination import (
+    CursorPage,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from network.common.services import LikeCounterService, LikedSetService
 from network.profiles.models import Profile
 
 
@@ -77,6 +86,7 @@ class ProfileInfoMixin:
 
     cached_proterties:
         - profile picture url
+        - profile picture variants
         - username
 
     """
@@ -86,32 +96,53 @@ class ProfileInfoMixin:
         """Return profile picture url."""
         return self.user.profile.profile_picture.url
 
+    @property
+    def profile_picture_variants(self):
+        """Return profile picture WebP variants."""
+        return self.user.profile.profile_picture_variants
+
     @property
     def username(self):
         """Return profile username."""
         return self.user.profile.username
 
 
-class LikeCountMixin(Model):
+class LikeCountMixin:
     """
-    Mixin to track and update like count.
+    Mixin for model to provide like count and requesting user's like state.
+
+    Properties:
+        - like_count: attached in batch by LikeService.attach, or fetched on access.
+        - liked_by_user: attached in batch by LikeService.attach, default False.
 
-    Fields:
-        - like_count: PostiveSmallIntergerField
     Methods:
-        - sync_like_count: update like_count with db count.
+        - set_liked_by_user: set liked_by_user for a user.
 
     """
 
-    like_count = PositiveSmallIntegerField(default=0)
+    @property
+    def like_count(self):
+        """Return like count."""
+        if not hasattr(self, "_like_count"):
+            LikeCounterService.attach([self])
+        return self._like_count
 
-    class Meta:
-        abstract = True
+    @like_count.setter
+    def like_count(self, value):
+        self._like_count = value
+
+    @property
+    def liked_by_user(self):
+        """Return True if the requesting user likes this object. Otherwise False."""
+        return getattr(self, "_liked_by_user", False)
 
-    def sync_like_count(self):
-        """Update like_count in object and save it."""
-        self.like_count = self.likes.count()
-        self.save(update_fields=["like_count"])
+    @liked_by_user.setter
+    def liked_by_user(self, value):
+        self._liked_by_user = value
+
+    def set_liked_by_user(self, user):
+        """Set update-to-date liked by user."""
+        LikedSetService.attach([self], user)
 
 
 class CommentCountMixin(Model):
@@ -119,28 +150,85 @@ class CommentCountMixin(Model):
     Mixin to track and update comment count.
 
     Fields:
-        - comment_count: PostiveSmallIntergerField
+        - comment_count: PositiveIntegerField
     Methods:
-        - sync_like_count: update like_count with db count.
+        - update_comment_count: apply a delta to comment_count in db.
+        - sync_comment_count: update comment_count with db count.
 
     """
 
-    comment_count = PositiveSmallIntegerField(default=0)
+    comment_count = PositiveIntegerField(default=0)
 
     class Meta:
         abstract = True
 
-    # TODO Implement periodically aync comment count sync task later.
+    def update_comment_count(self, delta):
+        """
+        Apply delta to comment_count with an atomic UPDATE and refresh it.
+
+        Call it in the same transaction that creates or deletes the comments.
+        """
+        type(self).objects.filter(pk=self.pk).invalidated_update(
+            comment_count=Greatest(F("comment_count") + delta, 0)
+        )
+        self.refresh_from_db(fields=["comment_count"])
+
     def sync_comment_count(self):
         """
-        Update like_count in object and save it.
+        Update comment_count in object and save it.
 
-        It's meant for aync periodically update to ensure data consistency.
+        Deltas keep the count current, this is for repairing a single drifted row.
         """
         self.comment_count = self.comments.count()
         self.save(update_fields=["comment_count"])
 
 
+class CursorPaginationMixin:
+    """
+    ListView mixin paginating by (created_at, pkid) keyset instead of OFFSET.
+
+    The next page is requested with an opaque `cursor` token of the last
+    object, so every page costs one index range scan regardless of depth and
+    no COUNT(*) is issued. The `page` number is only carried along for
+    templates, e.g. as fragment cache key.
+    """
+
+    cursor_kwarg = "cursor"
+
+    def get_page_number(self):
+        """Return requested page number, default to 1."""
+        page = self.request.GET.get(self.page_kwarg, "1")
+        return int(page) if page.isdigit() and int(page) > 0 else 1
+
+    def paginate_queryset(self, queryset, page_size):
+        """Fetch the page after the cursor, plus one row to tell if there is more."""
+        queryset = queryset.order_by("-created_at", "-pkid")
+
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor:
+            try:
+                created_at, pkid = decode_cursor(cursor)
+            except InvalidCursorError as e:
+                msg = "Invalid cursor."
+                raise Http404(msg) from e
+
+            # Keep a plain range on created_at so the index can be used.
+            queryset = queryset.filter(created_at__lte=created_at).exclude(
+                created_at=created_at, pkid__gte=pkid
+            )
+
+        objects = list(queryset[: page_size + 1])
+        has_next = len(objects) > page_size
+        objects = objects[:page_size]
+
+        page = CursorPage(
+            object_list=objects,
+            number=self.get_page_number(),
+            next_cursor=encode_cursor(objects[-1]) if has_next else None,
+        )
+        return (None, page, objects, page.has_other_pages())
+
+
 class SetHtmxAlertTriggerMixin:
     """Set HTMX event trigger for custom frontend alert."""
 
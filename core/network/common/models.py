@@ -28,6 +28,7 @@ class MediaBaseModel(TimestampedModel):
         - file(file): file saved is uploaded to what 'post_media_path' specifies
         - order(int):
         - type(char): 'image' or 'video'
+        - variants(json): {width: file name} of the image's WebP variants
 
     Methods:
         - is_image: check if the instance is from type image
@@ -42,6 +43,7 @@ class MediaBaseModel(TimestampedModel):
     file = models.FileField(upload_to=post_media_path, null=True, blank=True)
     order = models.SmallIntegerField(default=0)
     type = models.CharField(max_length=10, choices=MediaType.choices)
+    variants = models.JSONField(default=dict, blank=True)
 
     class Meta(TimestampedModel.Meta):
         abstract = True
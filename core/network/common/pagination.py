@@ -0,0 +1,152 @@
+"""Custom paginations."""
+
+import base64
+import binascii
+import contextlib
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .constants import COUNT_CACHE_TIMEOUT, ESTIMATED_COUNT_THRESHOLD
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(obj):
+    """Encode (created_at, pkid) of an object into an opaque url-safe token."""
+    payload = json.dumps([obj.created_at.isoformat(), obj.pkid])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor token back to (created_at, pkid)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pkid = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(pkid)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError(cursor) from e
+
+
+class CursorPage:
+    """
+    Page of a keyset paginated list.
+
+    Mimics the parts of Django's Page used by templates, so the page number
+    keeps working as fragment cache key while the cursor drives the query.
+    """
+
+    def __init__(self, object_list, number, next_cursor) -> None:
+        self.object_list = object_list
+        self.number = number
+        self.next_cursor = next_cursor
+
+    def __iter__(self):  # noqa: ANN204
+        """Iterate page objects."""
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        """Return the number of objects in the page."""
+        return len(self.object_list)
+
+    def __getitem__(self, index):  # noqa: ANN204
+        """Return page object(s) by index or slice."""
+        return self.object_list[index]
+
+    def has_next(self):
+        """Check if there is a next page."""
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """Check if there is a previous page."""
+        return self.number > 1
+
+    def has_other_pages(self):
+        """Check if there is any other page."""
+        return self.has_previous() or self.has_next()
+
+    def next_page_number(self):
+        """Return next page number."""
+        return self.number + 1
+
+    @property
+    def next_query(self):
+        """Return the querystring that fetches the next page."""
+        return urlencode({"cursor": self.next_cursor, "page": self.number + 1})
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that avoids an exact COUNT(*) on every request.
+
+    The count is read from a cache counter at `count_key`, which writers keep
+    current with `incr_count`. On a miss, big tables use the pg_class.reltuples
+    estimate, otherwise an exact count is taken and seeded into the counter.
+    Without `count_key`, e.g. in admin changelists, only unfiltered querysets
+    are estimated.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        *args,
+        count_key=None,
+        estimate_threshold=ESTIMATED_COUNT_THRESHOLD,
+        **kwargs,
+    ) -> None:
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.count_key = count_key
+        self.estimate_threshold = estimate_threshold
+
+    @cached_property
+    def count(self):
+        """Return the cached, estimated or exact number of objects."""
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        if self.count_key:
+            count = cache.get(self.count_key)
+            if count is not None:
+                return count
+
+        if self.count_key or not self.object_list.query.has_filters():
+            estimate = self.get_estimated_count()
+            if estimate >= self.estimate_threshold:
+                return estimate
+
+        count = super().count
+        if self.count_key:
+            cache.add(self.count_key, count, timeout=COUNT_CACHE_TIMEOUT)
+        return count
+
+    def get_estimated_count(self):
+        """Return planner's row estimate of the queryset's table."""
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return 0
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.query.get_meta().db_table],
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 until the table is first vacuumed or analyzed
+        return max(row[0], 0) if row else 0
+
+    @staticmethod
+    def incr_count(count_key, delta=1):
+        """Apply delta to a cached count, leave it to be seeded on next read if missing."""
+        with contextlib.suppress(ValueError):
+            cache.incr(count_key, delta)
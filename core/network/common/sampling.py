@@ -0,0 +1,47 @@
+"""Random row sampling."""
+
+import random
+
+from django.db.models import Max, Min
+
+from .constants import SAMPLE_FETCH_WHOLE_FACTOR, SAMPLE_PROBE_ROUNDS
+
+
+def sample_queryset(queryset, k):
+    """
+    Return up to k random distinct rows of the queryset, in random order.
+
+    Avoids ORDER BY RANDOM(), which sorts the whole set. Sets of a few rows
+    are fetched and sampled in Python. Larger sets are sampled by probing
+    random points of the pkid range for the first pkid at or after each, one
+    index lookup per probe, all sent as one UNION query. Probes hitting an
+    already picked row, or nothing as rows were deleted meanwhile, are retried
+    in a few more rounds. Rows right after a gap in pkids are somewhat likelier
+    picks, which is fine for display.
+    """
+    if k <= 0:
+        return []
+
+    queryset = queryset.nocache()  # random queries would only fill the cache
+    pkids_qs = queryset.order_by("pkid").values_list("pkid", flat=True)
+    fetch_whole_limit = k * SAMPLE_FETCH_WHOLE_FACTOR
+
+    pkids = list(pkids_qs[: fetch_whole_limit + 1])
+    if len(pkids) > fetch_whole_limit:
+        bounds = queryset.order_by().aggregate(low=Min("pkid"), high=Max("pkid"))
+        picked = set()
+        for _ in range(SAMPLE_PROBE_ROUNDS):
+            probes = [
+                pkids_qs.filter(
+                    pkid__gte=random.randint(bounds["low"], bounds["high"])
+                )[:1]
+                for _ in range(k - len(picked))
+            ]
+            picked.update(probes[0].union(*probes[1:]))
+            if len(picked) == k:
+                break
+        pkids = list(picked)
+
+    pkids = random.sample(pkids, min(k, len(pkids)))
+    rows = queryset.in_bulk(pkids)
+    return [rows[pkid] for pkid in pkids if pkid in rows]
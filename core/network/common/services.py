@@ -0,0 +1,324 @@
+"""Common services."""
+
+import random
+from functools import partial
+from uuid import uuid4
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Count
+
+from network.tools.media import generate_webp_variants
+
+from .constants import LIKE_COUNT_TIMEOUT, LIKE_COUNT_TIMEOUT_JITTER, LIKED_SET_TIMEOUT
+from .tasks import generate_media_variants
+
+TOGGLE_LIKE_SQL = """
+WITH deleted AS (
+    DELETE FROM {like_table}
+    WHERE user_id = %(user_pkid)s AND {target_column} = %(target_pkid)s
+    RETURNING 1
+), inserted AS (
+    INSERT INTO {like_table} (id, created_at, updated_at, user_id, {target_column})
+    SELECT %(like_id)s, now(), now(), %(user_pkid)s, %(target_pkid)s
+    WHERE NOT EXISTS (SELECT 1 FROM deleted)
+    ON CONFLICT DO NOTHING
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM inserted) - (SELECT count(*) FROM deleted)
+"""
+
+# Only apply the delta to counts already seeded, misses are counted from db on read
+INCR_IF_EXISTS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+# Only update liked sets already seeded, misses are loaded from db on read
+UPDATE_IF_EXISTS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    if ARGV[2] == '1' then
+        return redis.call('SADD', KEYS[1], ARGV[1])
+    end
+    return redis.call('SREM', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+class LikeCounterService:
+    """
+    Service for like counts of models using LikeCountMixin.
+
+    Counts live in one Redis key per object instead of on the model row, so
+    likes do not invalidate cacheops' cached querysets. Each count expires on
+    its own, a jittered while after it was seeded, to heal any drift.
+    """
+
+    @staticmethod
+    def get_key(model, pkid):
+        """Like count key of an object."""
+        return f"like_count:{model.__name__.lower()}:{pkid}"
+
+    @staticmethod
+    def get_client():
+        """Return raw redis client of the default cache."""
+        return cache.client.get_client()
+
+    @staticmethod
+    def get_counts(model, pkids):
+        """Return {pkid: like_count} of the objects, counting misses from db."""
+        if not pkids:
+            return {}
+
+        client = LikeCounterService.get_client()
+
+        values = client.mget(
+            [LikeCounterService.get_key(model, pkid) for pkid in pkids]
+        )
+        counts = {
+            pkid: int(value)
+            for pkid, value in zip(pkids, values, strict=True)
+            if value is not None
+        }
+
+        misses = [pkid for pkid in pkids if pkid not in counts]
+        if misses:
+            seeded = LikeCounterService.count_likes(model, misses)
+            with client.pipeline(transaction=False) as pipe:
+                for pkid, count in seeded.items():
+                    # Spread expiry so counts seeded together are not re-seeded together
+                    timeout = LIKE_COUNT_TIMEOUT + random.randint(
+                        0, LIKE_COUNT_TIMEOUT_JITTER
+                    )
+                    pipe.set(
+                        LikeCounterService.get_key(model, pkid),
+                        count,
+                        ex=timeout,
+                        nx=True,
+                    )
+                pipe.execute()
+            counts.update(seeded)
+
+        return counts
+
+    @staticmethod
+    def count_likes(model, pkids):
+        """Return {pkid: like_count} counted from the like table."""
+        fk = model.likes.field  # e.g. PostLike.post
+        counts = dict.fromkeys(pkids, 0)
+        counts.update(
+            fk.model.objects.filter(**{f"{fk.name}__in": pkids})
+            .order_by()
+            .values_list(fk.name)
+            .annotate(count=Count("pkid"))
+        )
+        return counts
+
+    @staticmethod
+    def incr(model, pkid, delta):
+        """Apply delta to a seeded like count and return it, None if not seeded."""
+        script = LikeCounterService.get_client().register_script(INCR_IF_EXISTS_LUA)
+        return script(keys=[LikeCounterService.get_key(model, pkid)], args=[delta])
+
+    @staticmethod
+    def attach(objects):
+        """Attach like counts to model instances in one round trip."""
+        if not objects:
+            return
+
+        counts = LikeCounterService.get_counts(
+            type(objects[0]), [obj.pkid for obj in objects]
+        )
+        for obj in objects:
+            obj.like_count = counts[obj.pkid]
+
+
+class LikedSetService:
+    """
+    Service for caching which objects of a model a user has liked.
+
+    Each user has one Redis set per model of liked pkids, seeded from db on a
+    miss. A sentinel member tells a seeded empty set from a missing one.
+    """
+
+    SENTINEL = 0  # never a valid pkid
+
+    @staticmethod
+    def get_key(model, user_pkid):
+        """Liked set key of the user."""
+        return f"liked:{model.__name__.lower()}:{user_pkid}"
+
+    @staticmethod
+    def get_liked(model, user, pkids):
+        """Return the subset of pkids liked by the user."""
+        if not pkids or user is None or not user.is_authenticated:
+            return set()
+
+        key = LikedSetService.get_key(model, user.pkid)
+        with LikeCounterService.get_client().pipeline(transaction=False) as pipe:
+            pipe.exists(key)
+            pipe.smismember(key, pkids)
+            exists, members = pipe.execute()
+
+        if not exists:
+            liked_pkids = LikedSetService.seed(model, user)
+            return liked_pkids.intersection(pkids)
+        return {pkid for pkid, member in zip(pkids, members, strict=True) if member}
+
+    @staticmethod
+    def seed(model, user):
+        """Load pkids liked by the user into the liked set and return them."""
+        fk = model.likes.field  # e.g. PostLike.post
+        liked_pkids = set(
+            fk.model.objects.filter(user=user).values_list(fk.name, flat=True)
+        )
+
+        key = LikedSetService.get_key(model, user.pkid)
+        with LikeCounterService.get_client().pipeline(transaction=False) as pipe:
+            pipe.sadd(key, LikedSetService.SENTINEL, *liked_pkids)
+            pipe.expire(key, LIKED_SET_TIMEOUT)
+            pipe.execute()
+        return liked_pkids
+
+    @staticmethod
+    def update(model, user, pkid, liked):
+        """Add or remove a pkid in a seeded liked set."""
+        script = LikeCounterService.get_client().register_script(UPDATE_IF_EXISTS_LUA)
+        script(
+            keys=[LikedSetService.get_key(model, user.pkid)],
+            args=[pkid, int(liked)],
+        )
+
+    @staticmethod
+    def attach(objects, user):
+        """Attach liked_by_user of the user to model instances in one round trip."""
+        if not objects:
+            return
+
+        liked_pkids = LikedSetService.get_liked(
+            type(objects[0]), user, [obj.pkid for obj in objects]
+        )
+        for obj in objects:
+            obj.liked_by_user = obj.pkid in liked_pkids
+
+
+class LikeService:
+    """Service for toggling likes of models using LikeCountMixin."""
+
+    @staticmethod
+    def attach(objects, user=None):
+        """
+        Attach like counts and, for a given user, like states to a page of objects.
+
+        Views call it on the objects they render, so each costs one round trip
+        per page instead of one per object.
+        """
+        objects = list(objects)
+        LikeCounterService.attach(objects)
+        if user is not None:
+            LikedSetService.attach(objects, user)
+
+    @staticmethod
+    def toggle(like_model, target_field, target, user):
+        """
+        Like or unlike the target and return (like_count, liked).
+
+        Deleting or inserting the like row happens in one statement, then the
+        delta goes to the like counter, so the cost does not grow with the
+        like count and the target row is left untouched.
+
+        Args:
+            like_model: like model, e.g. PostLike.
+            target_field: like model's foreign key to the target, e.g. "post".
+            target: liked object.
+            user: requesting user.
+
+        """
+        like_meta = like_model._meta  # noqa: SLF001
+        sql = TOGGLE_LIKE_SQL.format(
+            like_table=connection.ops.quote_name(like_meta.db_table),
+            target_column=connection.ops.quote_name(
+                like_meta.get_field(target_field).column
+            ),
+        )
+        params = {
+            "like_id": str(uuid4()),
+            "user_pkid": user.pkid,
+            "target_pkid": target.pkid,
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            (delta,) = cursor.fetchone()
+
+        target_model = type(target)
+        like_count = (
+            LikeCounterService.incr(target_model, target.pkid, delta) if delta else None
+        )
+        if like_count is None:
+            like_count = LikeCounterService.get_counts(target_model, [target.pkid])[
+                target.pkid
+            ]
+
+        # Nothing changed only when a concurrent request already liked it
+        liked = delta >= 0
+        LikedSetService.update(target_model, user, target.pkid, liked)
+
+        target.like_count = like_count
+        target.liked_by_user = liked
+        return like_count, liked
+
+
+class MediaVariantService:
+    """
+    Service for generating responsive WebP variants of uploaded images.
+
+    Variants are generated by a Celery task once the upload commits and
+    recorded as {width: file name} on the model, for templates to emit srcset.
+    """
+
+    @staticmethod
+    def schedule(instances, file_field="file", variants_field="variants"):
+        """Enqueue variant generation of the instances' images after the transaction commits."""
+        for instance in instances:
+            transaction.on_commit(
+                partial(
+                    generate_media_variants.delay,
+                    instance._meta.label,  # noqa: SLF001
+                    instance.pk,
+                    getattr(instance, file_field).name,
+                    file_field,
+                    variants_field,
+                )
+            )
+
+    @staticmethod
+    def generate(model_label, pk, file_name, file_field, variants_field):
+        """Generate and save the variants of an instance's image, unless it was replaced."""
+        instance = apps.get_model(model_label).objects.nocache().filter(pk=pk).first()
+        file = getattr(instance, file_field, None)
+        if not file or file.name != file_name:
+            return
+
+        setattr(instance, variants_field, generate_webp_variants(file))
+        # Emit save signals so cached fragments showing the image are invalidated
+        instance.save(update_fields=[variants_field])
+
+    @staticmethod
+    def delete_variants(variants, original_name):
+        """Delete the variant files of a deleted or replaced image after the transaction commits."""
+        # The original is recorded among its variants, django-cleanup deletes it
+        names = [name for name in variants.values() if name != original_name]
+        if names:
+            transaction.on_commit(partial(MediaVariantService.delete_files, names))
+
+    @staticmethod
+    def delete_files(names):
+        """Delete files from the storage."""
+        for name in names:
+            default_storage.delete(name)
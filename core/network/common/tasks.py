@@ -0,0 +1,11 @@
+"""Celery tasks for common apps."""
+
+from celery import shared_task
+
+
+@shared_task
+def generate_media_variants(model_label, pk, file_name, file_field, variants_field):
+    """Celery task to generate the WebP variants of an uploaded image."""
+    from .services import MediaVariantService
+
+    MediaVariantService.generate(model_label, pk, file_name, file_field, variants_field)
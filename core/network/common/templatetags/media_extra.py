@@ -0,0 +1,24 @@
+"""Custom template tags for media template."""
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(variants, sizes="100vw"):
+    """
+    Return srcset and sizes attributes of an image's {width: file name} variants.
+
+    Return nothing until variants narrower than the original are generated,
+    so the img falls back to its src.
+    """
+    if len(variants) < 2:  # noqa: PLR2004
+        return ""
+    candidates = ", ".join(
+        f"{default_storage.url(name)} {width}w"
+        for width, name in sorted(variants.items(), key=lambda item: int(item[0]))
+    )
+    return format_html(' srcset="{}" sizes="{}"', candidates, sizes)
@@ -0,0 +1,29 @@
+"""Generate media variants command."""
+
+from django.core.management import BaseCommand
+
+from network.albums.models import AlbumMedia
+from network.common.services import MediaVariantService
+from network.posts.models import PostMedia
+from network.profiles.models import Profile
+
+
+class Command(BaseCommand):
+    """Command for enqueuing variant generation of images uploaded before variants."""
+
+    def handle(self, *args, **options):
+        """Enqueue variant generation of every image without variants."""
+        for model in [PostMedia, AlbumMedia]:
+            medias = model.objects.filter(type=model.MediaType.IMAGE, variants={})
+            MediaVariantService.schedule(medias.iterator())
+
+        profiles = (
+            Profile.objects.nocache()
+            .filter(profile_picture_variants={})
+            .exclude(profile_picture="")
+            .exclude(profile_picture__startswith="defaults/")
+        )
+        MediaVariantService.schedule(
+            profiles.iterator(), "profile_picture", "profile_picture_variants"
+        )
+        self.stdout.write(self.style.SUCCESS("Media variant generation enqueued."))
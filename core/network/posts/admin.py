@@ -2,6 +2,8 @@
 
 from django.contrib import admin
 
+from network.common.pagination import CachedCountPaginator
+
 from .models import Post, PostMedia
 
 
@@ -20,6 +22,8 @@ class PostAdmin(admin.ModelAdmin):
     list_display = ["id", "username", "content"]
     list_display_links = ["id"]
     ordering = ["-created_at"]
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     inlines = [PostMediaInline]
 
     def username(self, obj):
@@ -35,3 +39,5 @@ class PostMediaAdmin(admin.ModelAdmin):
     list_display = ["id"]
     search_fields = ["id"]
     ordering = ["created_at"]
+    paginator = CachedCountPaginator
+    show_full_result_count = False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "network.posts"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,4 +1,42 @@
-"""Incubation constants."""
+"""Incubation and timeline constants."""
 
 MIN_INCUBATION_MINUTES = 20
 MAX_INCUBATION_MINUTES = 30  # 24 hours in minutes
+PUBLISH_BATCH_SIZE = 500  # due posts published per statement
+
+# Following timeline
+TIMELINE_MAX_LENGTH = 800  # posts kept per user timeline sorted set
+FANOUT_FOLLOWER_LIMIT = 1000  # above this, author's posts are pulled at read time
+TIMELINE_BACKFILL_LENGTH = 50  # posts pushed to a timeline on follow
+
+# Trending feed
+TRENDING_KEY = "trending:posts"
+TRENDING_WINDOW_HOURS = 72  # only posts published within this window are ranked
+TRENDING_MAX_LENGTH = 500  # posts kept in the trending sorted set
+TRENDING_COMMENT_WEIGHT = 2  # a comment counts as this many likes
+TRENDING_GRAVITY = 1.8  # how fast a post's score decays with age
+
+# Hatch event streams
+HATCH_EVENTS_CHANNEL = "post_hatch_events"  # suffixed with the post author's pkid
+HATCH_EVENTS_MAX_LENGTH = 50  # events kept per user for replay on reconnect
+HATCH_EVENTS_TIMEOUT = 60 * 60 * 24
+HATCH_QUEUE_MAX_SIZE = 10  # events buffered per open stream
+HATCH_STREAM_HEARTBEAT_SECONDS = 15
+HATCH_STREAM_IDLE_SECONDS = 60 * 5  # streams without events are closed after this
+
+# Media ingestion
+MEDIA_STAGING_DIR = "staging"  # uploads wait here until a worker ingests them
+
+# Post card comments
+POST_CARD_COMMENTS = 2  # latest top level comments shown on a post card
+
+# Feed paginator
+PUBLISHED_POSTS_COUNT_KEY = "posts:published:count"
+
+# Rendered post card cache
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+POST_CARD_VERSION_BATCH_SIZE = 500  # versions bumped per round trip
+
+# Turboy sidebar snapshot
+TURBOY_SNAPSHOT_TIMEOUT = 60 * 60
+TURBOY_FOLLOWER_SAMPLE_SIZE = 12  # followers kept to pick the displayed ones from
@@ -0,0 +1,365 @@
+"""Post feeds."""
+
+from datetime import timedelta
+from operator import itemgetter
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from network.common.services import LikeCounterService
+from network.profiles.models import Profile
+
+from .constants import (
+    FANOUT_FOLLOWER_LIMIT,
+    TIMELINE_BACKFILL_LENGTH,
+    TIMELINE_MAX_LENGTH,
+    TRENDING_COMMENT_WEIGHT,
+    TRENDING_GRAVITY,
+    TRENDING_KEY,
+    TRENDING_MAX_LENGTH,
+    TRENDING_WINDOW_HOURS,
+)
+from .models import Post
+
+
+def get_posts_in_order(pkids):
+    """Return published posts with list data in the given pkid order."""
+    posts = Post.objects.published().filter(pkid__in=pkids).in_bulk()
+    return [posts[pkid] for pkid in pkids if pkid in posts]
+
+
+class TimelineService:
+    """
+    Service for maintaining per-user following timelines in Redis.
+
+    Each timeline is a capped sorted set of post pkids scored by creation time.
+    Posts are pushed to followers on publish (fan-out on write), except for
+    authors with more than FANOUT_FOLLOWER_LIMIT followers, whose posts are
+    pulled and merged at read time instead.
+    """
+
+    PULL_AUTHORS_KEY = "timeline:pull_authors"
+
+    @staticmethod
+    def timeline_key(user_pkid):
+        """Timeline sorted set key."""
+        return f"timeline:{user_pkid}"
+
+    @staticmethod
+    def get_client():
+        """Return raw redis client of the default cache."""
+        return cache.client.get_client()
+
+    @staticmethod
+    def fan_out(post):
+        """Push a published post into its author's and followers' timelines."""
+        client = TimelineService.get_client()
+        follower_ids = list(
+            post.user.profile.followers.values_list("user_id", flat=True)[
+                : FANOUT_FOLLOWER_LIMIT + 1
+            ]
+        )
+
+        if len(follower_ids) > FANOUT_FOLLOWER_LIMIT:
+            client.sadd(TimelineService.PULL_AUTHORS_KEY, post.user_id)
+            follower_ids = []  # followers pull this author's posts at read time
+        else:
+            client.srem(TimelineService.PULL_AUTHORS_KEY, post.user_id)
+
+        TimelineService.push_posts(
+            user_pkids=[post.user_id, *follower_ids],
+            entries={post.pkid: post.created_at.timestamp()},
+        )
+
+    @staticmethod
+    def push_posts(user_pkids, entries):
+        """Add {post_pkid: score} entries to each timeline and trim it to the cap."""
+        if not entries:
+            return
+
+        with TimelineService.get_client().pipeline(transaction=False) as pipe:
+            for user_pkid in user_pkids:
+                key = TimelineService.timeline_key(user_pkid)
+                pipe.zadd(key, entries)
+                pipe.zremrangebyrank(key, 0, -TIMELINE_MAX_LENGTH - 1)
+            pipe.execute()
+
+    @staticmethod
+    def remove_post(post):
+        """Remove a deleted post from its author's and followers' timelines."""
+        # Look followers up by the author's user, whose profile may be deleted too
+        follower_ids = list(
+            Profile.objects.filter(following__user_id=post.user_id).values_list(
+                "user_id", flat=True
+            )[:FANOUT_FOLLOWER_LIMIT]
+        )
+        with TimelineService.get_client().pipeline(transaction=False) as pipe:
+            for user_pkid in [post.user_id, *follower_ids]:
+                pipe.zrem(TimelineService.timeline_key(user_pkid), post.pkid)
+            pipe.execute()
+
+    @staticmethod
+    def rebuild(user, pull_author_ids):
+        """
+        Fill an empty timeline with the latest posts of the user's followed authors.
+
+        Timelines are otherwise only filled on publish and follow, so this
+        covers follows made before timelines existed and evicted timelines.
+        Posts of pull authors are left out, they are merged at read time.
+        """
+        posts = (
+            Post.objects.all()
+            .published()
+            .filter(
+                user_id__in=user.profile.following.exclude(
+                    user_id__in=pull_author_ids
+                ).values("user_id")
+            )
+            .order_by("-created_at")
+            .values_list("pkid", "created_at")[:TIMELINE_MAX_LENGTH]
+        )
+        TimelineService.push_posts(
+            user_pkids=[user.pkid],
+            entries={pkid: created_at.timestamp() for pkid, created_at in posts},
+        )
+
+    @staticmethod
+    def add_author_posts(user, author):
+        """Backfill the author's latest posts into the user's timeline after following."""
+        if TimelineService.is_pull_author(author.pkid):
+            return
+
+        posts = (
+            Post.objects.all()
+            .published()
+            .by_user(author)
+            .values_list("pkid", "created_at")[:TIMELINE_BACKFILL_LENGTH]
+        )
+        TimelineService.push_posts(
+            user_pkids=[user.pkid],
+            entries={pkid: created_at.timestamp() for pkid, created_at in posts},
+        )
+
+    @staticmethod
+    def remove_author_posts(user, author):
+        """Remove the author's posts from the user's timeline after unfollowing."""
+        pkids = list(
+            Post.objects.all()
+            .published()
+            .by_user(author)
+            .values_list("pkid", flat=True)[:TIMELINE_MAX_LENGTH]
+        )
+        if pkids:
+            TimelineService.get_client().zrem(
+                TimelineService.timeline_key(user.pkid), *pkids
+            )
+
+    @staticmethod
+    def is_pull_author(user_pkid):
+        """Check if the author's posts are pulled at read time."""
+        return TimelineService.get_client().sismember(
+            TimelineService.PULL_AUTHORS_KEY, user_pkid
+        )
+
+    @staticmethod
+    def get_pull_author_ids(user):
+        """Return pkids of followed authors whose posts are pulled at read time."""
+        pull_author_ids = TimelineService.get_client().smembers(
+            TimelineService.PULL_AUTHORS_KEY
+        )
+        if not pull_author_ids:
+            return []
+
+        return list(
+            user.profile.following.filter(
+                user_id__in=[int(pkid) for pkid in pull_author_ids]
+            ).values_list("user_id", flat=True)
+        )
+
+    @staticmethod
+    def get_entries(user_pkid, start, end):
+        """Return [(post_pkid, score), ...] of a timeline, newest first."""
+        entries = TimelineService.get_client().zrevrange(
+            TimelineService.timeline_key(user_pkid), start, end, withscores=True
+        )
+        return [(int(pkid), score) for pkid, score in entries]
+
+    @staticmethod
+    def get_size(user_pkid):
+        """Return the number of posts in a timeline."""
+        return TimelineService.get_client().zcard(
+            TimelineService.timeline_key(user_pkid)
+        )
+
+
+class FollowingFeed:
+    """
+    Lazy, sliceable post sequence of a user's following timeline.
+
+    Meant to be paginated by Django's Paginator: count() and slicing only
+    touch the timeline sorted set, then posts of the page are fetched by pkid.
+    """
+
+    def __init__(self, user) -> None:
+        self.user = user
+        self.pull_author_ids = TimelineService.get_pull_author_ids(user)
+        if not TimelineService.get_size(user.pkid):
+            TimelineService.rebuild(user, self.pull_author_ids)
+
+    def count(self):
+        """Return the number of posts in the feed."""
+        size = TimelineService.get_size(self.user.pkid)
+        if self.pull_author_ids:
+            size += self.get_pulled_posts().count()
+        return min(size, TIMELINE_MAX_LENGTH)
+
+    def __len__(self) -> int:
+        """Return the number of posts in the feed."""
+        return self.count()
+
+    def __getitem__(self, index):  # noqa: ANN204
+        """Return the posts of a slice, as sliced by Paginator."""
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        start, stop = index.start or 0, index.stop or TIMELINE_MAX_LENGTH
+        return get_posts_in_order(self.get_page_pkids(start, stop))
+
+    def get_pulled_posts(self):
+        """Return published posts by followed authors that are not fanned out."""
+        return Post.objects.all().published().filter(user_id__in=self.pull_author_ids)
+
+    def get_page_pkids(self, start, stop):
+        """Return post pkids in [start, stop) of the merged timeline."""
+        if not self.pull_author_ids:
+            entries = TimelineService.get_entries(self.user.pkid, start, stop - 1)
+            return [pkid for pkid, _ in entries]
+
+        # Merge pushed and pulled posts, both only up to the end of the page.
+        entries = TimelineService.get_entries(self.user.pkid, 0, stop - 1)
+        entries += [
+            (pkid, created_at.timestamp())
+            for pkid, created_at in self.get_pulled_posts().values_list(
+                "pkid", "created_at"
+            )[:stop]
+        ]
+        entries.sort(key=itemgetter(1), reverse=True)
+        pkids = list(dict.fromkeys(pkid for pkid, _ in entries))
+        return pkids[start:stop]
+
+
+class TrendingService:
+    """
+    Service for the trending ranking of recent posts.
+
+    Ranking is computed off the request path by a periodic task and stored as
+    a sorted set of post pkids, so reading the feed is a range over the set.
+    """
+
+    @staticmethod
+    def get_client():
+        """Return raw redis client of the default cache."""
+        return cache.client.get_client()
+
+    @staticmethod
+    def get_candidates():
+        """Return (pkids, like counts, comment counts, ages in hours) of recent posts."""
+        current_time = now()
+        rows = list(
+            Post.objects.all()
+            .published()
+            .filter(
+                created_at__gte=current_time - timedelta(hours=TRENDING_WINDOW_HOURS)
+            )
+            .order_by()
+            .values_list("pkid", "comment_count", "created_at")
+        )
+        pkids = [pkid for pkid, _, _ in rows]
+        like_counts = LikeCounterService.get_counts(Post, pkids)
+        return (
+            pkids,
+            [like_counts[pkid] for pkid in pkids],
+            [comment_count for _, comment_count, _ in rows],
+            [
+                (current_time - created_at).total_seconds() / 3600
+                for *_, created_at in rows
+            ],
+        )
+
+    @staticmethod
+    def score(like_counts, comment_counts, ages):
+        """
+        Return the trending score of each candidate.
+
+        Engagement decays with age, so a fresh post with a few likes can
+        outrank an older one with many. The +1 keeps posts without any
+        engagement ordered by recency.
+        """
+        return [
+            (1 + likes + TRENDING_COMMENT_WEIGHT * comments)
+            / (age + 2) ** TRENDING_GRAVITY
+            for likes, comments, age in zip(
+                like_counts, comment_counts, ages, strict=True
+            )
+        ]
+
+    @staticmethod
+    def rank():
+        """Recompute the trending sorted set and return the number of ranked posts."""
+        pkids, like_counts, comment_counts, ages = TrendingService.get_candidates()
+        scores = TrendingService.score(like_counts, comment_counts, ages)
+        ranked = sorted(
+            zip(pkids, scores, strict=True), key=itemgetter(1), reverse=True
+        )[:TRENDING_MAX_LENGTH]
+
+        client = TrendingService.get_client()
+        if not ranked:
+            client.delete(TRENDING_KEY)
+            return 0
+
+        # Build aside and swap in, so readers never see a partial ranking
+        temp_key = f"{TRENDING_KEY}:{uuid4().hex}"
+        with client.pipeline() as pipe:
+            pipe.zadd(temp_key, dict(ranked))
+            pipe.rename(temp_key, TRENDING_KEY)
+            pipe.execute()
+        return len(ranked)
+
+    @staticmethod
+    def get_size():
+        """Return the number of ranked posts."""
+        return TrendingService.get_client().zcard(TRENDING_KEY)
+
+    @staticmethod
+    def get_pkids(start, end):
+        """Return ranked post pkids from start to end, both inclusive."""
+        return [
+            int(pkid)
+            for pkid in TrendingService.get_client().zrevrange(TRENDING_KEY, start, end)
+        ]
+
+
+class TrendingFeed:
+    """
+    Lazy, sliceable post sequence of the trending ranking.
+
+    Like FollowingFeed, count() and slicing only touch the trending sorted set,
+    then posts of the page are fetched by pkid.
+    """
+
+    def count(self):
+        """Return the number of posts in the feed."""
+        return TrendingService.get_size()
+
+    def __len__(self) -> int:
+        """Return the number of posts in the feed."""
+        return self.count()
+
+    def __getitem__(self, index):  # noqa: ANN204
+        """Return the posts of a slice, as sliced by Paginator."""
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        start, stop = index.start or 0, index.stop or TRENDING_MAX_LENGTH
+        return get_posts_in_order(TrendingService.get_pkids(start, stop - 1))
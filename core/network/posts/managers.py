@@ -1,35 +1,27 @@
 """Post mangers."""
 
+from collections import defaultdict
+
 from django.db import models
 
+from network.common.services import LikeService
+
+from .constants import POST_CARD_COMMENTS
+
 
 class PostQuerySet(models.QuerySet):
     """Customized Post queryset."""
 
-    def for_list_data(self, user=None):
-        """Select related profile."""
-        from network.comments.models import Comment
-
-        from .models import PostLike, PostMedia
+    def for_list_data(self):
+        """Select related profile and prefetch medias."""
+        from .models import PostMedia
 
         return self.select_related("user__profile", "egg").prefetch_related(
-            models.Prefetch(
-                "likes",
-                queryset=PostLike.objects.filter(user=user),
-                to_attr="user_likes",
-            ),  # liked by requesting user
             models.Prefetch(
                 "medias",
                 queryset=PostMedia.objects.order_by("order"),
                 to_attr="ordered_medias",
             ),
-            models.Prefetch(
-                "comments",
-                queryset=Comment.objects.prefetched_info_qs(user).filter(
-                    parent__isnull=True
-                ),
-                to_attr="top_level_comments",
-            ),  # top level comments
         )
 
     def by_user(self, user):
@@ -48,6 +40,35 @@ class PostManager(models.Manager):
         """Filter posts by user."""
         return PostQuerySet(model=self.model, using=self._db)
 
-    def published(self, user=None):
+    def published(self):
         """Return only published posts with necessary data."""
-        return self.get_queryset().for_list_data(user).published()
+        return self.get_queryset().for_list_data().published()
+
+    def attach_list_data(self, posts, user=None):
+        """Attach latest comments and like data of the user to rendered posts."""
+        posts = list(posts)
+        comments = self.attach_latest_comments(posts)
+        LikeService.attach(posts, user)
+        LikeService.attach(comments, user)
+
+    def attach_latest_comments(self, posts):
+        """
+        Attach the latest top level comments of each post as latest_comments.
+
+        Only the comments a card shows are fetched, in one query, instead of
+        prefetching every top level comment of the posts. Return the comments.
+        """
+        from network.comments.models import Comment
+
+        comments = list(
+            Comment.objects.latest_top_level(
+                [post.pkid for post in posts], POST_CARD_COMMENTS
+            )
+        )
+        comments_by_post = defaultdict(list)
+        for comment in comments:
+            comments_by_post[comment.post_id].append(comment)
+
+        for post in posts:
+            post.latest_comments = comments_by_post[post.pkid]
+        return comments
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0025_remove_post_comment_count"),
+        ("profiles", "0018_alter_egg_user"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="postmedia",
+            index=models.Index(
+                fields=["profile", "-created_at"], name="posts_postm_profile_b888d9_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:19
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_post_comment_count(apps, scheme_editor):
+    Post = apps.get_model("posts", "Post")
+    Comment = apps.get_model("comments", "Comment")
+
+    comment_count = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(count=Count("pkid"))
+        .values("count")
+    )
+    Post.objects.update(comment_count=Coalesce(Subquery(comment_count), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0026_postmedia_posts_postm_profile_b888d9_idx"),
+        ("comments", "0004_comment_comments_co_post_id_3d4abc_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            populate_post_comment_count, reverse_code=migrations.RunPython.noop
+        ),
+    ]
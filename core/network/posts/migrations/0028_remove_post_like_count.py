@@ -0,0 +1,16 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:22
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0027_post_comment_count"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="post",
+            name="like_count",
+        ),
+    ]
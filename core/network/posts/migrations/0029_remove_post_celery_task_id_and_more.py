@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0028_remove_post_like_count"),
+        ("profiles", "0018_alter_egg_user"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="post",
+            name="celery_task_id",
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", False)),
+                fields=["publish_at"],
+                name="posts_post_unpublished_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0029_remove_post_celery_task_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postmedia",
+            name="variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("posts", "0030_postmedia_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,22 +1,27 @@
 """Post models."""
 
-from cacheops import cached_as
 from django.conf import settings
 from django.db import models
 from django.utils.functional import cached_property
 
-from network.common.mixins import LikeCountMixin, ProfileInfoMixin
+from network.common.mixins import (
+    CommentCountMixin,
+    LikeCountMixin,
+    ProfileInfoMixin,
+)
 from network.common.models import MediaBaseModel, TimestampedModel
+from network.common.pagination import CachedCountPaginator
 from network.profiles.models import Egg, Profile
 
+from .constants import POST_CARD_COMMENTS, PUBLISHED_POSTS_COUNT_KEY
 from .managers import PostManager
-from .tasks import delete_task
 from .validators import validate_publish_time
 
 
 # Create your models here.
 class Post(
     LikeCountMixin,
+    CommentCountMixin,
     ProfileInfoMixin,
     TimestampedModel,
 ):
@@ -28,8 +33,6 @@ class Post(
     )
     publish_at = models.DateTimeField(null=True, blank=True)
     is_published = models.BooleanField(default=False)
-    # TODO this is ephemeral data, consider implement it other ways like cache or something.
-    celery_task_id = models.CharField(max_length=255, blank=True)
 
     egg = models.ForeignKey(Egg, on_delete=models.DO_NOTHING, related_name="posts")
 
@@ -39,6 +42,12 @@ class Post(
         indexes = [
             models.Index(fields=["-created_at"]),
             models.Index(fields=["user", "-created_at"]),
+            # Due posts lookup of PublishService
+            models.Index(
+                fields=["publish_at"],
+                condition=models.Q(is_published=False),
+                name="posts_post_unpublished_idx",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -48,28 +57,17 @@ class Post(
     @property
     def latest_two_comments(self):
         """Fetch first 2 top level comments."""
-        if not hasattr(self, "top_level_comments"):
-            return self.comments.prefetched_info_qs(self.user).filter(
-                parent__isnull=True
-            )[:2]
-        return self.top_level_comments[:2]
-
-    @property
-    def comment_count(self):
-        """Return the update-to-date comment count."""
-        from network.comments.models import Comment
-
-        comment_qs = Comment.objects.filter(post=self)
-
-        @cached_as(comment_qs, extra=self.pkid, timeout=None)
-        def _comment_count():
-            return self.comments.count()
-
-        return _comment_count()
+        if not hasattr(self, "latest_comments"):
+            return self.comments.prefetched_info_qs().filter(parent__isnull=True)[
+                :POST_CARD_COMMENTS
+            ]
+        return self.latest_comments
 
     @cached_property
     def medias_count(self):
-        """Return medias count."""
+        """Return medias count, from prefetched medias when list data has them."""
+        if hasattr(self, "ordered_medias"):
+            return len(self.ordered_medias)
         return self.medias.count()
 
     @property
@@ -84,16 +82,13 @@ class Post(
             for m in self.ordered_medias
         ]
 
-    @property
-    def liked_by_user(self):
-        """Return True if the requesting user likes this post. Otherwise False."""
-        return bool(self.user_likes) if hasattr(self, "user_likes") else False
-
     def delete(self, *args, **kwargs):
-        """Override delete method to revoke publish task."""
-        if self.celery_task_id:
-            delete_task(self.celery_task_id)
-        super().delete(*args, **kwargs)
+        """Override delete method to update published count."""
+        result = super().delete(*args, **kwargs)
+
+        if self.is_published:
+            CachedCountPaginator.incr_count(PUBLISHED_POSTS_COUNT_KEY, -1)
+        return result
 
     def clean(self):
         """Validate that publish_at is at least 20 minutes after created_at."""
@@ -136,6 +131,9 @@ class PostMedia(MediaBaseModel):
                 fields=["post", "order"], name="Unique order per post."
             )
         ]
+        indexes = [
+            models.Index(fields=["profile", "-created_at"]),
+        ]
 
     def __str__(self) -> str:
         """Return string Media Type: {type}. Order: {order}. From post: {post.pkid}."""
@@ -1,18 +1,122 @@
 """Post Serives."""
 
+import hashlib
+import json
 import random
+from contextlib import ExitStack
+from itertools import islice
 from pathlib import Path
+from uuid import uuid4
 
+from cacheops import invalidate_model
+from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.db import transaction
-from django.db.models import F, Max
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Coalesce
 from django.db.models.signals import post_save
 
-from network.profiles.models import Egg
+from network.common.pagination import CachedCountPaginator
+from network.common.sampling import sample_queryset
+from network.common.services import MediaVariantService
+from network.profiles.models import Egg, EggInventory, EggTypeChoices
+
+from .constants import (
+    MEDIA_STAGING_DIR,
+    POST_CARD_CACHE_TIMEOUT,
+    POST_CARD_VERSION_BATCH_SIZE,
+    PUBLISH_BATCH_SIZE,
+    PUBLISHED_POSTS_COUNT_KEY,
+    TURBOY_FOLLOWER_SAMPLE_SIZE,
+    TURBOY_SNAPSHOT_TIMEOUT,
+)
+from .feeds import TimelineService
+from .models import Post, PostMedia
+from .streams import publish_hatch_events
+from .utils import get_random_publish_time, get_random_timeout, get_timesince_simple
+
+
+class MediaIngestionService:
+    """
+    Service for ingesting uploaded medias in the background.
+
+    Requests only stage uploads and enqueue their ingestion. A Celery worker
+    then saves them as media rows, allocating orders under a lock of the
+    target row, and reports each upload on the uploader's event stream.
+    """
 
-from .models import PostMedia
-from .tasks import assign_publish_task
-from .utils import get_random_publish_time, get_random_timeout
+    @staticmethod
+    def stage(uploads):
+        """Move [(file, media type)] uploads to the staging area and return them as task arguments."""
+        return [
+            {
+                "upload_id": str(uuid4()),
+                "name": default_storage.save(
+                    f"{MEDIA_STAGING_DIR}/{uuid4()}{Path(file.name).suffix}", file
+                ),
+                "type": media_type,
+            }
+            for file, media_type in uploads
+        ]
+
+    @staticmethod
+    def open_staged(upload):
+        """Return a staged upload as a File to assign to a media file field."""
+        name = upload["name"]
+        return File(default_storage.open(name), name=Path(name).name)
+
+    @staticmethod
+    def discard(staged):
+        """Delete staged uploads."""
+        for upload in staged:
+            default_storage.delete(upload["name"])
+
+    @staticmethod
+    def notify(user_pkid, staged, status, **target_ids):
+        """Report each upload's ingestion status as a media event of the uploader."""
+        publish_hatch_events(
+            cache.client.get_client(),
+            [
+                (
+                    user_pkid,
+                    "media",
+                    json.dumps(
+                        {"upload_id": upload["upload_id"], "status": status}
+                        | target_ids
+                    ),
+                )
+                for upload in staged
+            ],
+        )
+
+    @staticmethod
+    def ingest(user_pkid, staged, save_medias, **target_ids):
+        """
+        Pass staged uploads as [(media type, file)] to save_medias in a transaction.
+
+        Staged uploads are discarded and the uploader is notified whether
+        saving them succeeded or failed.
+        """
+        status = "failed"
+        try:
+            with ExitStack() as stack, transaction.atomic():
+                save_medias(
+                    [
+                        (
+                            upload["type"],
+                            stack.enter_context(
+                                MediaIngestionService.open_staged(upload)
+                            ),
+                        )
+                        for upload in staged
+                    ]
+                )
+            status = "ready"
+        finally:
+            MediaIngestionService.discard(staged)
+            MediaIngestionService.notify(user_pkid, staged, status, **target_ids)
 
 
 class PostMediaService:
@@ -20,8 +124,14 @@ class PostMediaService:
 
     @staticmethod
     def save_media(post, images=None, video=None):
-        """Save images and/or video as PostMedia linked to a post and emit save signal."""
+        """
+        Save images and/or video as PostMedia linked to a post and emit save signal.
+
+        Call it in a transaction. The post row is locked so concurrent saves
+        allocate media orders one after another.
+        """
         media_instances = []
+        Post.objects.select_for_update().nocache().only("pkid").get(pkid=post.pkid)
 
         if images:
             max_order = PostMediaService.get_max_order(post)
@@ -42,6 +152,32 @@ class PostMediaService:
         if media_instances:
             medias = PostMedia.objects.bulk_create(media_instances)
             PostMediaService.emit_save_signal(medias[0])
+            MediaVariantService.schedule(media for media in medias if media.is_image())
+
+    @staticmethod
+    def ingest(post_id, user_pkid, staged):
+        """Save staged uploads as medias of a post, see MediaIngestionService."""
+
+        def save_medias(files):
+            post = Post.objects.select_related("user__profile").get(id=post_id)
+            PostMediaService.save_media(
+                post,
+                images=[
+                    file
+                    for media_type, file in files
+                    if media_type == PostMedia.MediaType.IMAGE
+                ],
+                video=next(
+                    (
+                        file
+                        for media_type, file in files
+                        if media_type == PostMedia.MediaType.VIDEO
+                    ),
+                    None,
+                ),
+            )
+
+        MediaIngestionService.ingest(user_pkid, staged, save_medias, post_id=post_id)
 
     @staticmethod
     def create_media(post, file, media_type, order):
@@ -147,17 +283,15 @@ class IncubationService:
         """
         Incucbate a post.
 
-        1. Set a publish time for post
-        2. Schedule publish time
-        3. Save incubating check in cache.
+        1. Set a publish time for post, PublishService publishes it when due
+        2. Save incubating check in cache.
         """
         timeout = get_random_timeout()
         with transaction.atomic():
             post.publish_at = get_random_publish_time(timeout)
-            post.celery_task_id = assign_publish_task(post)
             IncubationService.set_incubating_egg_url(post.user.id, egg_url, timeout)
             IncubationService.set_incubating_post_id(post.user.id, post.id, timeout)
-            post.save(update_fields=["publish_at", "celery_task_id"])
+            post.save(update_fields=["publish_at"])
 
     @staticmethod
     def set_incubating_post_id(user_id, post_id, timeout):
@@ -189,6 +323,100 @@ class IncubationService:
         return f"incubating:{suffix}:{user_id}"
 
 
+PUBLISH_DUE_POSTS_SQL = """
+UPDATE {post_table} SET is_published = true
+WHERE pkid IN (
+    SELECT pkid FROM {post_table}
+    WHERE NOT is_published AND publish_at <= now()
+    ORDER BY publish_at
+    LIMIT %(batch_size)s
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING pkid
+"""
+
+
+class PublishService:
+    """
+    Service for publishing incubated posts once their publish time is due.
+
+    A periodic task drains due posts in batches through the unpublished
+    publish_at index, instead of scheduling one Celery ETA task per post.
+    """
+
+    @staticmethod
+    def publish_due_posts(batch_size=PUBLISH_BATCH_SIZE):
+        """
+        Publish up to batch_size due posts and return them.
+
+        Posts are claimed and published in one statement. SKIP LOCKED lets
+        overlapping runs take different posts instead of waiting or
+        publishing a post twice.
+        """
+        sql = PUBLISH_DUE_POSTS_SQL.format(
+            post_table=connection.ops.quote_name(Post._meta.db_table)  # noqa: SLF001
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {"batch_size": batch_size})
+            pkids = [pkid for (pkid,) in cursor.fetchall()]
+
+        if not pkids:
+            return []
+
+        # The raw UPDATE bypasses cacheops and post_save receivers
+        invalidate_model(Post)
+        PostCardCacheService.bump_versions(pkids)
+        CachedCountPaginator.incr_count(PUBLISHED_POSTS_COUNT_KEY, len(pkids))
+
+        posts = list(
+            Post.objects.filter(pkid__in=pkids).select_related("user__profile")
+        )
+        for post in posts:
+            TimelineService.fan_out(post)
+
+        publish_hatch_events(
+            cache.client.get_client(),
+            [
+                (post.user_id, "hatch", json.dumps({"post_id": str(post.id)}))
+                for post in posts
+            ],
+        )
+        return posts
+
+
+UPSERT_EGG_SQL = """
+WITH upserted AS (
+    INSERT INTO {egg_table} AS egg
+        (id, created_at, updated_at, url, quantity, name, egg_type, user_id)
+    VALUES (%(id)s, now(), now(), %(url)s, 1, %(name)s, %(egg_type)s, %(user_id)s)
+    ON CONFLICT (user_id, url)
+    DO UPDATE SET quantity = egg.quantity + 1, updated_at = now()
+    RETURNING egg.*, (egg.xmax = 0) AS inserted
+),
+counted AS (
+    INSERT INTO {inventory_table} AS inventory
+        (id, created_at, updated_at, user_id,
+         special_count, special_quantity,
+         regular_count, regular_quantity,
+         easter_count, easter_quantity)
+    SELECT %(inventory_id)s, now(), now(), user_id,
+        (egg_type = 'special' AND inserted)::int, (egg_type = 'special')::int,
+        (egg_type = 'regular' AND inserted)::int, (egg_type = 'regular')::int,
+        (egg_type = 'easter' AND inserted)::int, (egg_type = 'easter')::int
+    FROM upserted
+    ON CONFLICT (user_id) DO UPDATE SET
+        special_count = inventory.special_count + excluded.special_count,
+        special_quantity = inventory.special_quantity + excluded.special_quantity,
+        regular_count = inventory.regular_count + excluded.regular_count,
+        regular_quantity = inventory.regular_quantity + excluded.regular_quantity,
+        easter_count = inventory.easter_count + excluded.easter_count,
+        easter_quantity = inventory.easter_quantity + excluded.easter_quantity,
+        updated_at = now()
+)
+SELECT * FROM upserted
+"""
+
+
 class EggManageService:
     """Egg Create or update service."""
 
@@ -203,19 +431,53 @@ class EggManageService:
 
     @staticmethod
     def create_egg_or_update_qnt(user, egg_url):
-        """Create egg associated with user or update the egg quantity."""
-        egg_type = EggManageService.get_egg_type(egg_url)
-        egg, created = Egg.objects.get_or_create(
-            user=user,
-            url=egg_url,
-            egg_type=egg_type,
-        )
-        if not created:
-            egg.quantity = F("quantity") + 1
-            egg.save()
+        """
+        Create egg associated with user or update the egg quantity, and its inventory.
 
+        One upsert statement inserts the egg, or bumps its quantity on the
+        (user, url) conflict, and counts it in the user's inventory, so
+        parallel post creations neither duplicate eggs nor lose counts.
+        """
+        sql = UPSERT_EGG_SQL.format(
+            egg_table=connection.ops.quote_name(Egg._meta.db_table),  # noqa: SLF001
+            inventory_table=connection.ops.quote_name(
+                EggInventory._meta.db_table  # noqa: SLF001
+            ),
+        )
+        params = {
+            "id": uuid4(),
+            "inventory_id": uuid4(),
+            "user_id": user.pk,
+            "url": egg_url,
+            "name": EggManageService.get_egg_name(egg_url),
+            "egg_type": EggManageService.get_egg_type(egg_url),
+        }
+        egg = next(iter(Egg.objects.raw(sql, params)))
+        egg.user = user
+
+        # The raw upsert bypasses post_save receivers, cacheops' included
+        post_save.send(
+            sender=Egg,
+            instance=egg,
+            created=egg.inserted,
+            using="default",
+            raw=False,
+            update_fields=None,
+        )
         return egg
 
+    @staticmethod
+    def rebuild_inventory(user_id):
+        """Recompute a user's existing egg inventory from its eggs."""
+        stats = {}
+        for egg_type in EggTypeChoices.values:
+            in_type = Q(egg_type=egg_type)
+            stats[f"{egg_type}_count"] = Count("pkid", filter=in_type)
+            stats[f"{egg_type}_quantity"] = Coalesce(Sum("quantity", filter=in_type), 0)
+        EggInventory.objects.filter(user_id=user_id).update(
+            **Egg.objects.filter(user_id=user_id).nocache().aggregate(**stats)
+        )
+
     @staticmethod
     def get_static_egg_img_url(egg_url):
         """Change Egg extenstion to .png."""
@@ -228,3 +490,189 @@ class EggManageService:
         """Return egg name."""
         path = Path(egg_url)
         return path.stem
+
+
+class TurboySnapshotService:
+    """
+    Service for the per-user snapshot of turboy sidebar data.
+
+    Follower and egg data are computed once and cached until an Egg or follow
+    change invalidates it. Only the login state of the displayed followers is
+    fetched per request, so their activity status is live.
+    """
+
+    @staticmethod
+    def cache_key(profile_pkid):
+        """Snapshot cache key of a profile."""
+        return f"turboy:snapshot:v2:{profile_pkid}"  # v2 keeps follower rows
+
+    @staticmethod
+    def get_snapshot(profile):
+        """Return the profile's snapshot, building it on a miss."""
+        key = TurboySnapshotService.cache_key(profile.pkid)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = TurboySnapshotService.build_snapshot(profile)
+            cache.set(key, snapshot, timeout=TURBOY_SNAPSHOT_TIMEOUT)
+        return snapshot
+
+    @staticmethod
+    def build_snapshot(profile):
+        """
+        Return followers count, a random followers sample and eggs by type.
+
+        Eggs are one row per egg kind, so one query fetches them all for the
+        display eggs to be picked from. Egg counts come from the inventory.
+        """
+        followers = sample_queryset(
+            profile.followers.all(), TURBOY_FOLLOWER_SAMPLE_SIZE
+        )
+        followers_count = profile.followers.count()
+
+        eggs = {egg_type: [] for egg_type in EggTypeChoices.values}
+        for egg in Egg.objects.filter(user_id=profile.user_id):
+            eggs[egg.egg_type].append(egg)
+
+        return {
+            "followers_count": followers_count,
+            "followers": followers,
+            "eggs": eggs,
+        }
+
+    @staticmethod
+    def get_followers(snapshot, count):
+        """Return up to count random followers of the snapshot sample with their users."""
+        followers = snapshot["followers"]
+
+        # Activity status depends on login state, which the snapshot doesn't keep.
+        # Users of the whole sample are fetched so the query is the same on every
+        # request and served by the cache until one of them logs in or out.
+        users = get_user_model().objects.in_bulk(
+            [follower.user_id for follower in followers]
+        )
+
+        # Skip followers deleted since the snapshot was built
+        followers = [follower for follower in followers if follower.user_id in users]
+        followers = random.sample(followers, min(count, len(followers)))
+        for follower in followers:
+            follower.user = users[follower.user_id]
+        return followers
+
+    @staticmethod
+    def invalidate(profile_pkids):
+        """Delete snapshots of the profiles."""
+        cache.delete_many(
+            [TurboySnapshotService.cache_key(pkid) for pkid in profile_pkids]
+        )
+
+
+class PostCardCacheService:
+    """
+    Service for caching rendered, viewer-independent post cards.
+
+    A card is keyed by post pkid, a post version bumped on any change shown
+    in the card, a render variant and the relative time labels it displays.
+    Per-viewer state is rendered outside the cached card. Versions expire with
+    the cards, a missing version is simply created anew.
+    """
+
+    @staticmethod
+    def version_key(post_pkid):
+        """Post card version key."""
+        return f"post_card:version:{post_pkid}"
+
+    @staticmethod
+    def bump_versions(post_pkids):
+        """Give the posts new card versions so their cached cards are skipped."""
+        cache.set_many(
+            {
+                PostCardCacheService.version_key(pkid): uuid4().hex
+                for pkid in post_pkids
+            },
+            timeout=POST_CARD_CACHE_TIMEOUT,
+        )
+
+    @staticmethod
+    def bump_author_versions(user):
+        """Bump card versions of the posts a user wrote or commented on, in batches."""
+        post_pkids = (
+            user.posts.nocache()
+            .order_by()
+            .values_list("pkid", flat=True)
+            .union(user.comments.order_by().values_list("post_id", flat=True))
+            .iterator(chunk_size=POST_CARD_VERSION_BATCH_SIZE)
+        )
+        while batch := list(islice(post_pkids, POST_CARD_VERSION_BATCH_SIZE)):
+            PostCardCacheService.bump_versions(batch)
+
+    @staticmethod
+    def delete_versions(post_pkids):
+        """Delete card versions of deleted posts."""
+        cache.delete_many(
+            [PostCardCacheService.version_key(pkid) for pkid in post_pkids]
+        )
+
+    @staticmethod
+    def get_versions(post_pkids):
+        """Return {post_pkid: version}, creating versions that don't exist yet."""
+        keys = {pkid: PostCardCacheService.version_key(pkid) for pkid in post_pkids}
+        versions = cache.get_many(keys.values())
+
+        missing = {key: uuid4().hex for key in keys.values() if key not in versions}
+        if missing:
+            cache.set_many(missing, timeout=POST_CARD_CACHE_TIMEOUT)
+            versions.update(missing)
+
+        return {pkid: versions[key] for pkid, key in keys.items()}
+
+    @staticmethod
+    def get_variant(is_authenticated, toolkit_display_direction=None):
+        """Return the render variant of a card."""
+        return f"{int(is_authenticated)}:{toolkit_display_direction or ''}"
+
+    @staticmethod
+    def get_card_key(post, version, variant):
+        """Return the cache key of a rendered card."""
+        # Relative times like '5 minutes' are rendered in the card
+        created_ats = [post.created_at] + [
+            comment.created_at for comment in post.latest_two_comments
+        ]
+        time_labels = "|".join(get_timesince_simple(value) for value in created_ats)
+        digest = hashlib.md5(time_labels.encode(), usedforsecurity=False).hexdigest()
+        return f"post_card:{post.pkid}:{version}:{variant}:{digest}"
+
+    @staticmethod
+    def prefetch(posts, variant):
+        """Fetch cached cards of a page of posts in one round trip."""
+        posts = list(posts)
+        if not posts:
+            return
+
+        versions = PostCardCacheService.get_versions([post.pkid for post in posts])
+        keys = {
+            post.pkid: PostCardCacheService.get_card_key(
+                post, versions[post.pkid], variant
+            )
+            for post in posts
+        }
+        cards = cache.get_many(keys.values())
+
+        for post in posts:
+            key = keys[post.pkid]
+            post.prefetched_card = (variant, key, cards.get(key))
+
+    @staticmethod
+    def get_or_render(post, variant, render):
+        """Return the cached card of a post, or render and cache it."""
+        prefetched_variant, key, card = getattr(
+            post, "prefetched_card", (None, None, None)
+        )
+        if prefetched_variant != variant:
+            version = PostCardCacheService.get_versions([post.pkid])[post.pkid]
+            key = PostCardCacheService.get_card_key(post, version, variant)
+            card = cache.get(key)
+
+        if card is None:
+            card = render()
+            cache.set(key, card, timeout=POST_CARD_CACHE_TIMEOUT)
+        return card
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .feeds import TimelineService
+from .models import Post, PostMedia
+from .services import PostCardCacheService
+
+
+@receiver([post_save], sender=Post)
+def bump_post_card_version(sender, instance, **kwargs):
+    PostCardCacheService.bump_versions([instance.pkid])
+
+
+@receiver([post_delete], sender=Post)
+def remove_post_from_timelines(sender, instance, **kwargs):
+    TimelineService.remove_post(instance)
+
+
+@receiver([post_delete], sender=Post)
+def delete_post_card_version(sender, instance, **kwargs):
+    PostCardCacheService.delete_versions([instance.pkid])
+
+
+@receiver([post_save, post_delete], sender=PostMedia)
+def bump_post_card_version_on_media_change(sender, instance, **kwargs):
+    PostCardCacheService.bump_versions([instance.post_id])
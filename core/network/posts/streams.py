@@ -0,0 +1,204 @@
+"""Post hatch event streams."""
+
+import asyncio
+import logging
+import re
+import time
+from collections import defaultdict
+
+import redis
+import redis.asyncio
+
+from .constants import (
+    HATCH_EVENTS_CHANNEL,
+    HATCH_EVENTS_MAX_LENGTH,
+    HATCH_EVENTS_TIMEOUT,
+    HATCH_QUEUE_MAX_SIZE,
+    HATCH_STREAM_HEARTBEAT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+EVENT_ID_PATTERN = re.compile(r"^(\d+)-(\d+)$")
+
+# Append the event to the user's capped stream, then publish it prefixed by its
+# stream id and name, in one atomic step so live and replayed events share ids
+PUBLISH_HATCH_EVENT_LUA = """
+local id = redis.call(
+    'XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'event', ARGV[5], 'data', ARGV[2]
+)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('PUBLISH', ARGV[4], id .. ' ' .. ARGV[5] .. ' ' .. ARGV[2])
+return id
+"""
+
+
+def get_hatch_channel(user_pkid):
+    """Hatch events channel of a user."""
+    return f"{HATCH_EVENTS_CHANNEL}:{user_pkid}"
+
+
+def get_hatch_events_key(user_pkid):
+    """Hatch events stream key of a user."""
+    return f"hatch_events:{user_pkid}"
+
+
+def parse_event_id(event_id):
+    """Return a stream entry id as a comparable (ms, seq) tuple, None if invalid."""
+    match = EVENT_ID_PATTERN.match(event_id or "")
+    return (int(match[1]), int(match[2])) if match else None
+
+
+def publish_hatch_events(client, events):
+    """Append [(user_pkid, event, data)] events to their users' streams and publish them."""
+    if not events:
+        return []
+
+    script = client.register_script(PUBLISH_HATCH_EVENT_LUA)
+    with client.pipeline(transaction=False) as pipe:
+        for user_pkid, event, data in events:
+            script(
+                keys=[get_hatch_events_key(user_pkid)],
+                args=[
+                    HATCH_EVENTS_MAX_LENGTH,
+                    data,
+                    HATCH_EVENTS_TIMEOUT,
+                    get_hatch_channel(user_pkid),
+                    event,
+                ],
+                client=pipe,
+            )
+        return [event_id.decode() for event_id in pipe.execute()]
+
+
+class HatchSubscription:
+    """In-memory queue of events for one open stream."""
+
+    def __init__(self, user_pkid) -> None:
+        self.user_pkid = str(user_pkid)
+        self.queue = asyncio.Queue(maxsize=HATCH_QUEUE_MAX_SIZE)
+        self.last_polled = time.monotonic()
+        self.active = True  # False once reaped by the hub
+
+    async def get(self):
+        """Wait for the next (event id, event, data)."""
+        self.last_polled = time.monotonic()
+        try:
+            return await self.queue.get()
+        finally:
+            self.last_polled = time.monotonic()
+
+    def put(self, event):
+        """Queue an (event id, event, data), drop it if the stream is not keeping up."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Hatch queue of user {self.user_pkid} is full.")
+
+
+class HatchEventHub:
+    """
+    Process-wide hatch event subscriber.
+
+    One task on the server's event loop holds a single pattern subscription to
+    every user's hatch channel and dispatches each event only to the queues of
+    that user's open streams, so a waiting stream costs a queue, not a Redis
+    connection or a thread. Events missed while disconnected are replayed from
+    the user's capped hatch events stream.
+
+    Besides "hatch" events of published posts, the channel carries "media"
+    events of ingested uploads.
+    """
+
+    def __init__(self) -> None:
+        self.subscriptions = defaultdict(set)  # {user_pkid: {HatchSubscription}}
+        self.client = None
+        self.task = None
+        self.last_reaped = time.monotonic()
+
+    def get_client(self):
+        """Return the async redis client, created on the server's event loop."""
+        if self.client is None:
+            self.client = redis.asyncio.StrictRedis(host="redis", port=6379, db=0)
+        return self.client
+
+    def subscribe(self, user_pkid):
+        """Register and return a subscription of the user's hatch events."""
+        subscription = HatchSubscription(user_pkid)
+        self.subscriptions[subscription.user_pkid].add(subscription)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.listen(), name="hatch-event-hub")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription."""
+        subscriptions = self.subscriptions.get(subscription.user_pkid)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self.subscriptions[subscription.user_pkid]
+
+    async def get_last_event_id(self, user_pkid):
+        """Return id of the user's latest hatch event, "0-0" if there is none."""
+        entries = await self.get_client().xrevrange(
+            get_hatch_events_key(user_pkid), count=1
+        )
+        return entries[0][0].decode() if entries else "0-0"
+
+    async def get_events_after(self, user_pkid, event_id):
+        """Return [(event id, event, data)] of the user's events after event_id."""
+        entries = await self.get_client().xrange(
+            get_hatch_events_key(user_pkid), min=f"({event_id}", max="+"
+        )
+        return [
+            (
+                entry_id.decode(),
+                fields.get(b"event", b"hatch").decode(),
+                fields[b"data"].decode(),
+            )
+            for entry_id, fields in entries
+        ]
+
+    async def listen(self):
+        """Dispatch hatch events to subscriptions, reconnecting on errors."""
+        while True:
+            try:
+                async with self.get_client().pubsub(
+                    ignore_subscribe_messages=True
+                ) as pubsub:
+                    await pubsub.psubscribe(get_hatch_channel("*"))
+                    while True:
+                        message = await pubsub.get_message(timeout=1.0)
+                        if message is not None:
+                            self.dispatch(message)
+                        self.reap()
+            except (redis.ConnectionError, redis.TimeoutError):
+                logger.warning("Hatch event hub lost Redis, reconnecting.")
+                await asyncio.sleep(1)
+
+    def dispatch(self, message):
+        """Put a pubsub message's (event id, event, data) into its user's subscriptions."""
+        user_pkid = message["channel"].decode().rsplit(":", 1)[-1]
+        event_id, event, data = message["data"].decode().split(" ", 2)
+        for subscription in self.subscriptions.get(user_pkid, ()):
+            subscription.put((event_id, event, data))
+
+    def reap(self):
+        """Remove subscriptions whose stream stopped polling without unsubscribing."""
+        current_time = time.monotonic()
+        if current_time - self.last_reaped < HATCH_STREAM_HEARTBEAT_SECONDS:
+            return
+        self.last_reaped = current_time
+
+        stale_before = current_time - HATCH_STREAM_HEARTBEAT_SECONDS * 2
+        for subscriptions in self.subscriptions.values():
+            stale = [s for s in subscriptions if s.last_polled < stale_before]
+            for subscription in stale:
+                subscription.active = False
+            subscriptions.difference_update(stale)
+        for user_pkid in [u for u, s in self.subscriptions.items() if not s]:
+            del self.subscriptions[user_pkid]
+
+
+hatch_event_hub = HatchEventHub()
@@ -1,59 +1,76 @@
 """Celery tasks for post apps."""
 
-import json
 import logging
 
-import redis
 from celery import shared_task
-from django.utils.timezone import now
-from project4.celery import app
-
-logger = logging.getLogger(__name__)
-
-# Initialize Redis client
-# Assuming Redis is accessible at 'redis' hostname and default port 6379
-# This should match the Redis service name in docker-compose.yml
-redis_client = redis.StrictRedis(host="redis", port=6379, db=0)
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task
-def publish_post(post_id):
-    """Celery task to publish post by setting is_publish to True."""
-    from .models import Post  # Import inside to avoid circular imports
+def publish_due_posts():
+    """Celery task to publish posts whose publish time is due, batch by batch."""
+    from .constants import PUBLISH_BATCH_SIZE
+    from .services import PublishService  # Import inside to avoid circular imports
 
-    try:
-        post = Post.objects.get(id=post_id)
+    published = 0
+    while True:
+        posts = PublishService.publish_due_posts(PUBLISH_BATCH_SIZE)
+        published += len(posts)
+        # A short batch means nothing is due anymore
+        if len(posts) < PUBLISH_BATCH_SIZE:
+            break
 
-        post.is_published = True
-        post.save(update_fields=["is_published"])
+    if published:
+        logger.info(f"Published {published} due posts.")
 
-        logger.info(f"Post publish time: {post.publish_at}")
-        logger.info(f"Current time: {now()}")
 
-        # Publish to Redis channel
-        message = {"post_id": str(post.id)}
-        redis_client.publish("post_hatch_events", json.dumps(message))
-        logger.info(f"Published hatch event for post {post.id} to Redis.")
+@shared_task
+def reconcile_comment_counts():
+    """Celery task to repair posts whose comment_count drifted from their comments."""
+    from django.db.models import Count, F, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+
+    from network.comments.models import Comment
+
+    from .models import Post
+
+    actual_count = Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(count=Count("pkid"))
+            .values("count")
+        ),
+        0,
+    )
+    drifted_pkids = list(
+        Post.objects.annotate(actual_count=actual_count)
+        .exclude(comment_count=F("actual_count"))
+        .values_list("pkid", flat=True)
+    )
+
+    # Recount inside the UPDATE so concurrent deltas are not overwritten
+    if drifted_pkids:
+        Post.objects.filter(pkid__in=drifted_pkids).invalidated_update(
+            comment_count=actual_count
+        )
+    logger.info(f"Reconciled comment count of {len(drifted_pkids)} posts.")
 
-    except Post.DoesNotExist:
-        # Optionally log a warning here
-        logger.warning(f"Post id {post_id} does not exist.")
 
+@shared_task
+def rank_trending_posts():
+    """Celery task to recompute the trending feed ranking."""
+    from .feeds import TrendingService
 
-# TODO Consider separating tasks and tasks manager logic
-def assign_publish_task(post):
-    """Assing publish post task and return task id."""
-    # If the task has already been scheduled, revoke it
-    if post.celery_task_id:
-        delete_task(post.celery_task_id)
+    ranked = TrendingService.rank()
+    logger.info(f"Ranked {ranked} trending posts.")
 
-    # Schedule the new task
-    task = publish_post.apply_async(args=[post.id], eta=post.publish_at)
-    return task.id
 
+@shared_task
+def ingest_post_medias(post_id, user_pkid, staged):
+    """Celery task to save staged uploads as medias of a post."""
+    from .services import PostMediaService
 
-def delete_task(task_id):
-    """Delete task by id."""
-    app.control.revoke(task_id)
+    PostMediaService.ingest(post_id, user_pkid, staged)
@@ -1,10 +1,11 @@
 """Custom template tags for post template."""
 
+import json
+
 from django import template
-from django.utils.timesince import timesince
 
-from network.posts.services import IncubationService
-from network.posts.utils import get_like_stat
+from network.posts.services import IncubationService, PostCardCacheService
+from network.posts.utils import get_like_stat, get_timesince_simple
 
 register = template.Library()
 
@@ -18,9 +19,7 @@ def like_stat_str(like_count, liked):
 @register.filter
 def timesince_simple(value):
     """Return fisrt part of timesince."""
-    result = timesince(value)
-
-    return result.split(",")[0]
+    return get_timesince_simple(value)
 
 
 @register.filter
@@ -28,3 +27,54 @@ def get_incubating_egg_url(request):
     """Return current incubating egg url in cache if exists, else return empty string."""
     user_id = request.user.id
     return IncubationService.get_incubating_egg_url(user_id) or ""
+
+
+@register.filter
+def comment_like_states(post):
+    """Return JSON of {comment id: {liked, likeCount}} for the comments shown in a post card."""
+    return json.dumps(
+        {
+            str(comment.id): {
+                "liked": comment.liked_by_user,
+                "likeCount": comment.like_count,
+            }
+            for comment in post.latest_two_comments
+        }
+    )
+
+
+class PostCardCacheNode(template.Node):
+    """Node rendering a post card from cache, see cache_post_card."""
+
+    def __init__(self, nodelist, post) -> None:
+        self.nodelist = nodelist
+        self.post = post
+
+    def render(self, context):
+        """Return cached card html or render and cache it."""
+        post = self.post.resolve(context)
+        variant = PostCardCacheService.get_variant(
+            is_authenticated=context["request"].user.is_authenticated,
+            toolkit_display_direction=context.get("toolkit_display_direction"),
+        )
+        return PostCardCacheService.get_or_render(
+            post, variant, render=lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def cache_post_card(parser, token):
+    """
+    Cache the viewer-independent part of a post card.
+
+    Usage:
+        {% cache_post_card post %} ... {% endcache_post_card %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:  # noqa: PLR2004
+        msg = f"'{bits[0]}' tag requires exactly one argument."
+        raise template.TemplateSyntaxError(msg)
+
+    nodelist = parser.parse(("endcache_post_card",))
+    parser.delete_first_token()
+    return PostCardCacheNode(nodelist, parser.compile_filter(bits[1]))
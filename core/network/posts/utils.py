@@ -4,6 +4,7 @@ import random
 from datetime import timedelta
 
 from django.utils import timezone
+from django.utils.timesince import timesince
 
 from .constants import MAX_INCUBATION_MINUTES, MIN_INCUBATION_MINUTES
 
@@ -21,6 +22,11 @@ def get_like_stat(like_count, liked) -> str:
     return str(like_count)
 
 
+def get_timesince_simple(value):
+    """Return first part of timesince, e.g. '3 hours'."""
+    return timesince(value).split(",")[0]
+
+
 def get_random_timeout():
     """Return random timeout in seconds."""
     return random.randint(MIN_INCUBATION_MINUTES, MAX_INCUBATION_MINUTES)
@@ -1,12 +1,14 @@
 """Post views."""
 
+import asyncio
 import json
 import random
+import time
+from functools import partial
 
-import redis
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.db import transaction
-from django.db.models.functions.math import Random
 from django.forms import ValidationError
 from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
@@ -21,16 +23,33 @@ from django.views.generic import (
 )
 
 from network.common.mixins import RefererRedirectMixin, SetHtmxAlertTriggerMixin
+from network.common.pagination import CachedCountPaginator
+from network.common.services import LikeService
+from network.profiles.constants import ONLINE_FOLLOWING_SHOWN
+from network.profiles.loaders import get_followed_loader
+from network.profiles.models import EggTypeChoices
 from network.profiles.services import ActivityManagerService
 
+from .constants import (
+    HATCH_STREAM_HEARTBEAT_SECONDS,
+    HATCH_STREAM_IDLE_SECONDS,
+    PUBLISHED_POSTS_COUNT_KEY,
+)
+from .feeds import FollowingFeed, TrendingFeed
 from .forms import PostForm
-from .models import Post, PostLike
-from .services import EggManageService, IncubationService, PostMediaService
+from .models import Post, PostLike, PostMedia
+from .services import (
+    EggManageService,
+    IncubationService,
+    MediaIngestionService,
+    PostCardCacheService,
+    PostMediaService,
+    TurboySnapshotService,
+)
+from .streams import hatch_event_hub, parse_event_id
+from .tasks import ingest_post_medias
 from .utils import get_like_stat
 
-# Initialize Redis client
-redis_client = redis.StrictRedis(host="redis", port=6379, db=0)
-
 
 class PostListView(ListView):
     """Post List View."""
@@ -38,67 +57,87 @@ class PostListView(ListView):
     template_name = "posts/list.html"
     context_object_name = "posts"
     paginate_by = 10
+    paginator_class = CachedCountPaginator
+
+    def get_feed_mode(self):
+        """Return the requested feed mode, 'following' is for authenticated users only."""
+        feed_mode = self.request.GET.get("feed")
+        if feed_mode == "trending":
+            return "trending"
+        if feed_mode == "following" and self.request.user.is_authenticated:
+            return "following"
+        return "latest"
 
     def get_queryset(self):
-        """Get optimized post queryset."""
-        if self.request.user.is_authenticated:
-            return Post.objects.published(user=self.request.user)
+        """Get optimized post queryset, or the trending or following feed."""
+        self.feed_mode = self.get_feed_mode()
+        if self.feed_mode == "trending":
+            return TrendingFeed()
+        if self.feed_mode == "following":
+            return FollowingFeed(self.request.user)
         return Post.objects.published()
 
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Count the latest feed from the cached published posts counter."""
+        if self.feed_mode == "latest":
+            kwargs["count_key"] = PUBLISHED_POSTS_COUNT_KEY
+        return super().get_paginator(queryset, per_page, **kwargs)
+
     def get_turboy_context(self, context):
         """Get egg and profile context for turboy."""
         profile = self.request.user.profile
         context["profile"] = profile
 
-        # Followers data
-        followers = profile.followers.select_related("user").order_by(Random())
-        context["random_3_followers"] = followers[:3]
-        context["followers_count"] = followers.count()
+        snapshot = TurboySnapshotService.get_snapshot(profile)
 
-        # Eggs data
-        easter_eggs = profile.easter_eggs
-        special_eggs = profile.special_eggs
-        regular_eggs = profile.regular_eggs
+        # Followers data
+        context["random_3_followers"] = TurboySnapshotService.get_followers(snapshot, 3)
+        ActivityManagerService.attach_activity_objs(context["random_3_followers"])
+        get_followed_loader(self.request).register(
+            [follower.pkid for follower in context["random_3_followers"]]
+        )
+        context["followers_count"] = snapshot["followers_count"]
 
-        regular_eggs_count = regular_eggs.count()
-        special_eggs_count = special_eggs.count()
-        easter_eggs_count = easter_eggs.count()
+        # Followed profiles online now
+        online_count, online_following = profile.get_online_following(
+            limit=ONLINE_FOLLOWING_SHOWN
+        )
+        ActivityManagerService.attach_activity_objs(online_following)
+        context["online_following_count"] = online_count
+        context["online_following"] = online_following
 
-        eggs_qunt = profile.get_eggs_qunt()
+        # Eggs data
+        eggs = snapshot["eggs"]
+        inventory = profile.egg_inventory
+        easter_eggs = eggs[EggTypeChoices.EASTER]
+        special_eggs = eggs[EggTypeChoices.SPECIAL]
+        regular_eggs = eggs[EggTypeChoices.REGULAR]
 
         context["egg_panels"] = [
             {
                 "label": "EASTER",
                 "color": "text-pink-300",
                 "shadow": "rgba(255, 255, 0, 0.5)",
-                "count": eggs_qunt["easter_eggs_count"],
-                "egg": easter_eggs[random.randint(0, easter_eggs_count - 1)]
-                if easter_eggs_count
-                else None,
+                "count": inventory.easter_quantity,
+                "egg": random.choice(easter_eggs) if easter_eggs else None,
             },
             {
                 "label": "LEGENDARY",
                 "color": "text-orange-300",
                 "shadow": "rgba(0, 255, 255, 0.5)",
-                "count": eggs_qunt["special_eggs_count"],
-                "egg": special_eggs[random.randint(0, special_eggs_count - 1)]
-                if special_eggs_count
-                else None,
+                "count": inventory.special_quantity,
+                "egg": random.choice(special_eggs) if special_eggs else None,
             },
             {
                 "label": "CUTE",
                 "color": "text-green-400",
                 "shadow": "rgba(59, 130, 246, 0.5)",
-                "count": eggs_qunt["regular_eggs_count"],
-                "egg": regular_eggs[random.randint(0, regular_eggs_count - 1)]
-                if regular_eggs_count
-                else None,
+                "count": inventory.regular_quantity,
+                "egg": random.choice(regular_eggs) if regular_eggs else None,
             },
         ]
 
-        context["total_eggs_count"] = (
-            regular_eggs_count + special_eggs_count + easter_eggs_count
-        )
+        context["total_eggs_count"] = inventory.total_count
 
         # Activity Data
         context["activity"] = ActivityManagerService.get_activity_obj(
@@ -114,6 +153,16 @@ class PostListView(ListView):
         )
 
         context["on_list_page"] = True
+        context["feed_mode"] = self.feed_mode
+
+        # Attach like data and fetch cached post cards of the page at once
+        Post.objects.attach_list_data(context["posts"], self.request.user)
+        PostCardCacheService.prefetch(
+            context["posts"],
+            variant=PostCardCacheService.get_variant(
+                self.request.user.is_authenticated, toolkit_display_direction="left"
+            ),
+        )
 
         if self.request.user.is_authenticated:
             context = self.get_turboy_context(context)
@@ -128,9 +177,11 @@ class PostModalView(DetailView):
 
     def get_object(self):
         """Get post by id."""
-        return get_object_or_404(
-            Post.objects.published(self.request.user), id=self.kwargs.get("post_id")
+        post = get_object_or_404(
+            Post.objects.published(), id=self.kwargs.get("post_id")
         )
+        Post.objects.attach_list_data([post], self.request.user)
+        return post
 
     def get_context_data(self, **kwargs):
         """Insert in detail card flag for dynamic media layout display."""
@@ -202,18 +253,29 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
 
 class MediaSaveView(LoginRequiredMixin, View):
-    """View to save post media."""
+    """View to stage post media for background ingestion."""
 
     def post(self, request, **kwargs):
-        """Save uploaded media to associated post."""
+        """Stage uploaded media of the requesting user's post and enqueue its ingestion."""
         post_id = request.POST.get("post_id")
-        post = get_object_or_404(Post, pkid=post_id)
+        post = get_object_or_404(Post, pkid=post_id, user=request.user)
 
-        images = request.FILES.getlist("images")
+        uploads = [
+            (image, PostMedia.MediaType.IMAGE)
+            for image in request.FILES.getlist("images")
+        ]
         video = request.FILES.get("video")
-
-        PostMediaService.save_media(post=post, video=video, images=images)
-        return HttpResponse(status=201)
+        if video:
+            uploads.append((video, PostMedia.MediaType.VIDEO))
+
+        if uploads:
+            staged = MediaIngestionService.stage(uploads)
+            transaction.on_commit(
+                partial(
+                    ingest_post_medias.delay, str(post.id), request.user.pkid, staged
+                )
+            )
+        return HttpResponse(status=202)
 
 
 class GetUserPostMixin:
@@ -223,11 +285,7 @@ class GetUserPostMixin:
         """Return the requesting user's own post object."""
         post_id = self.kwargs.get("post_id")
         user = self.request.user
-        return get_object_or_404(
-            Post.objects.published(user),
-            id=post_id,
-            user=user,
-        )
+        return get_object_or_404(Post.objects.published(), id=post_id, user=user)
 
 
 class PostEditView(
@@ -277,6 +335,7 @@ class PostEditView(
         # Post data needed for template
         post = self.object
         post.ordered_medias = post.medias.order_by("order")
+        Post.objects.attach_list_data([post], self.request.user)
 
         context = {
             "post": post,
@@ -349,9 +408,11 @@ class HatchedPostView(LoginRequiredMixin, DetailView):
 
     def get_object(self):
         """Get post by id."""
-        return get_object_or_404(
+        post = get_object_or_404(
             Post.objects.published(), id=self.kwargs.get("post_id")
         )
+        Post.objects.attach_list_data([post], self.request.user)
+        return post
 
     def get_context_data(self, **kwargs):
         """Insert egg toolkit display direction into context."""
@@ -361,26 +422,78 @@ class HatchedPostView(LoginRequiredMixin, DetailView):
         return context
 
 
-class PostHatchCheckView(LoginRequiredMixin, View):
-    """SSE endpoint to check if a post has hatched."""
+class PostHatchCheckView(View):
+    """
+    Async SSE endpoint to check if a post has hatched.
 
-    def get(self, request, *args, **kwargs):
+    Served on the ASGI server, a waiting stream only awaits its queue in
+    hatch_event_hub, so one process holds many idle streams.
+    """
+
+    async def get(self, request, *args, **kwargs):
         """Return StreamResponse for frontend to listen to hatching event."""
+        # LoginRequiredMixin reads request.user synchronously
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
 
-        def event_stream():
-            pubsub = redis_client.pubsub()
-            pubsub.subscribe("post_hatch_events")
-            for message in pubsub.listen():
-                if message["type"] == "message":
-                    data = json.loads(message["data"])
-                    yield f"event: hatch\ndata: {json.dumps(data)}\n\n"
+        # Sent back by EventSource when it reconnects
+        last_event_id = request.headers.get("Last-Event-ID")
+        if parse_event_id(last_event_id) is None:
+            last_event_id = None
 
         response = StreamingHttpResponse(
-            event_stream(), content_type="text/event-stream"
+            self.event_stream(user, last_event_id), content_type="text/event-stream"
         )
         response["Cache-Control"] = "no-cache"
         return response
 
+    async def event_stream(self, user, last_event_id=None):
+        """
+        Yield the user's own hatch and media events.
+
+        On reconnect, events after last_event_id are replayed from the user's
+        hatch events stream first. A fresh stream starts by sending the latest
+        event id without data, so that its reconnects replay from there.
+
+        Heartbeats keep the connection alive, and idle streams are closed for
+        the browser's EventSource to reconnect. On client disconnect Django
+        cancels the stream, which unsubscribes it.
+        """
+        # Subscribe before reading the stream, so no event falls in between
+        subscription = hatch_event_hub.subscribe(user.pkid)
+        try:
+            if last_event_id is None:
+                last_event_id = await hatch_event_hub.get_last_event_id(user.pkid)
+                yield f"id: {last_event_id}\n\n"
+            else:
+                for event_id, event, data in await hatch_event_hub.get_events_after(
+                    user.pkid, last_event_id
+                ):
+                    last_event_id = event_id
+                    yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+            last_seen = parse_event_id(last_event_id)
+            idle_since = time.monotonic()
+            while subscription.active:
+                try:
+                    async with asyncio.timeout(HATCH_STREAM_HEARTBEAT_SECONDS):
+                        event_id, event, data = await subscription.get()
+                except TimeoutError:
+                    if time.monotonic() - idle_since > HATCH_STREAM_IDLE_SECONDS:
+                        return
+                    yield ": heartbeat\n\n"
+                    continue
+
+                # Skip events already replayed
+                if parse_event_id(event_id) <= last_seen:
+                    continue
+                last_seen = parse_event_id(event_id)
+                idle_since = time.monotonic()
+                yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+        finally:
+            hatch_event_hub.unsubscribe(subscription)
+
 
 class LikePost(LoginRequiredMixin, View):
     """Like/Unlike a post view that returns the partial html of likes count."""
@@ -388,18 +501,13 @@ class LikePost(LoginRequiredMixin, View):
     template_name = "posts/partial/like_stat.html"
 
     def post(self, request, *args, **kwargs):
-        """Like the post and syncs with post's like_count field."""
-        user = self.request.user
+        """Toggle like of the post and return its like stat."""
         post = get_object_or_404(Post, id=kwargs.get("post_id"))
 
-        with transaction.atomic():
-            like, created = PostLike.objects.get_or_create(post=post, user=user)
-            if not created:
-                like.delete()
-
-            post.sync_like_count()
-
-        like_stat = get_like_stat(post.like_count, liked=created)
+        like_count, liked = LikeService.toggle(
+            like_model=PostLike, target_field="post", target=post, user=request.user
+        )
+        like_stat = get_like_stat(like_count, liked=liked)
 
         context = {
             "like_stat": like_stat,
@@ -2,7 +2,7 @@
 
 from django.contrib import admin
 
-from .models import Egg, Profile
+from .models import Egg, EggInventory, Profile
 
 
 @admin.register(Profile)
@@ -13,3 +13,8 @@ class ProfileAdmin(admin.ModelAdmin):
 @admin.register(Egg)
 class EggAdmin(admin.ModelAdmin):
     """Custom Profile admin."""
+
+
+@admin.register(EggInventory)
+class EggInventoryAdmin(admin.ModelAdmin):
+    """Custom Egg inventory admin."""
@@ -7,3 +7,6 @@ PROFILE_TABS = [
     "shells",
 ]
 PHOTO_TABS = ["uploads", "albums"]
+
+# Online following of turboy
+ONLINE_FOLLOWING_SHOWN = 3
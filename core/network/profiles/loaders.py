@@ -0,0 +1,33 @@
+"""Profile batch loaders of the request, see network.common.loaders."""
+
+from django.db.models import Count
+
+from network.albums.models import Album
+from network.common.loaders import get_loader
+
+
+def get_followed_loader(request):
+    """Return loader of whether the requesting user follows profiles, by profile pkid."""
+
+    def get_followed(profile_pkids):
+        user = request.user
+        if not user.is_authenticated:
+            return {}
+        return user.profile.get_followed(profile_pkids)
+
+    return get_loader(request, "followed_profiles", get_followed, default=False)
+
+
+def get_albums_count_loader(request):
+    """Return loader of profiles' albums count, by profile pkid."""
+
+    def get_albums_counts(profile_pkids):
+        return dict(
+            Album.objects.filter(profile_id__in=profile_pkids)
+            .order_by()
+            .values("profile_id")
+            .annotate(count=Count("pkid"))
+            .values_list("profile_id", "count")
+        )
+
+    return get_loader(request, "albums_count", get_albums_counts, default=0)
@@ -4,13 +4,23 @@ from network.profiles.services import ActivityManagerService
 
 
 # TODO For demo concept, make it complete later.
-ACTIVE_PATHS = [
-    "create/",
-    "edit/",
-    "delete/",
-    "follow/",
-    "like/",
-]
+ACTIVE_URL_NAMES = frozenset(
+    {
+        "post_create",
+        "post_edit",
+        "post_delete",
+        "post_like",
+        "comment_create",
+        "comment_edit",
+        "comment_delete",
+        "comment_like",
+        "album_create",
+        "album_edit",
+        "album_delete",
+        "profile_edit",
+        "follow",
+    }
+)
 
 
 class ActivityStatusMiddleware:
@@ -26,10 +36,9 @@ class ActivityStatusMiddleware:
     def process_view(self, request, view_func, view_args, view_kwargs):
         if not request.user.is_authenticated:
             return
-        path = request.path.lower()
-
-        is_active_request = any(active_path in path for active_path in ACTIVE_PATHS)
+        is_active_request = request.resolver_match.url_name in ACTIVE_URL_NAMES
         ActivityManagerService.update_activity_state(
             user_id=request.user.id,
+            user_pkid=request.user.pkid,
             is_active_request=is_active_request,
         )
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:41
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+EGG_TYPES = ["special", "regular", "easter"]
+
+
+def populate_egg_inventory(apps, scheme_editor):
+    Egg = apps.get_model("profiles", "Egg")
+    EggInventory = apps.get_model("profiles", "EggInventory")
+
+    stats = {}
+    for egg_type in EGG_TYPES:
+        in_type = Q(egg_type=egg_type)
+        stats[f"{egg_type}_count"] = Count("pkid", filter=in_type)
+        stats[f"{egg_type}_quantity"] = Coalesce(Sum("quantity", filter=in_type), 0)
+
+    rows = Egg.objects.order_by().values("user_id").annotate(**stats)
+    EggInventory.objects.bulk_create(
+        [EggInventory(**row) for row in rows.iterator()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("profiles", "0018_alter_egg_user"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EggInventory",
+            fields=[
+                (
+                    "pkid",
+                    models.BigAutoField(
+                        editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("special_count", models.PositiveIntegerField(default=0)),
+                ("special_quantity", models.PositiveIntegerField(default=0)),
+                ("regular_count", models.PositiveIntegerField(default=0)),
+                ("regular_quantity", models.PositiveIntegerField(default=0)),
+                ("easter_count", models.PositiveIntegerField(default=0)),
+                ("easter_quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="egg_inventory",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at", "-updated_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.RunPython(
+            populate_egg_inventory, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:52
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.db.models import Count, Min, Q, Sum
+
+EGG_TYPES = ["special", "regular", "easter"]
+
+
+def merge_duplicate_eggs(apps, scheme_editor):
+    Egg = apps.get_model("profiles", "Egg")
+    EggInventory = apps.get_model("profiles", "EggInventory")
+    Post = apps.get_model("posts", "Post")
+
+    duplicates = (
+        Egg.objects.order_by()
+        .values("user_id", "url")
+        .annotate(eggs=Count("pkid"), quantity=Sum("quantity"), kept=Min("pkid"))
+        .filter(eggs__gt=1)
+    )
+    # Committed before the constraint is added, as Postgres can't alter a table
+    # with pending deferred FK checks in the same transaction
+    with transaction.atomic():
+        merged_user_ids = set()
+        for row in duplicates:
+            others = Egg.objects.filter(user_id=row["user_id"], url=row["url"]).exclude(
+                pkid=row["kept"]
+            )
+            Post.objects.filter(egg__in=others).update(egg_id=row["kept"])
+            Egg.objects.filter(pkid=row["kept"]).update(quantity=row["quantity"])
+            others.delete()
+            merged_user_ids.add(row["user_id"])
+
+        # Merged eggs no longer count as distinct eggs
+        counts = {
+            f"{egg_type}_count": Count("pkid", filter=Q(egg_type=egg_type))
+            for egg_type in EGG_TYPES
+        }
+        for user_id in merged_user_ids:
+            EggInventory.objects.filter(user_id=user_id).update(
+                **Egg.objects.filter(user_id=user_id).aggregate(**counts)
+            )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("profiles", "0019_egginventory"),
+        ("posts", "0029_remove_post_celery_task_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_eggs, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="egg",
+            constraint=models.UniqueConstraint(
+                fields=("user", "url"), name="unique_egg_url_per_user"
+            ),
+        ),
+    ]
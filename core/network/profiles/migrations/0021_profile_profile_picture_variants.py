@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("profiles", "0020_egg_unique_egg_url_per_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="profile_picture_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
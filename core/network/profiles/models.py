@@ -1,5 +1,7 @@
 """Profile models."""
 
+from functools import cached_property
+
 from django.conf import settings
 from django.core.exceptions import BadRequest
 from django.db import models
@@ -8,7 +10,7 @@ from phonenumber_field.modelfields import PhoneNumberField
 from network.common.models import TimestampedModel
 from network.tools.media import generate_file_path
 
-from .services import ActivityManagerService
+from .services import ActivityManagerService, PresenceService
 
 
 class FollowMixin:
@@ -30,6 +32,31 @@ class FollowMixin:
         """Check if a user has followed the profile."""
         return self.following.filter(id=profile.id).exists()
 
+    def get_followed(self, profile_pkids):
+        """Return {profile pkid: True} of the given profiles followed, for batch loaders."""
+        return dict.fromkeys(
+            self.following.filter(pkid__in=profile_pkids).values_list(
+                "pkid", flat=True
+            ),
+            True,
+        )
+
+    def get_online_following(self, limit):
+        """Return (online count, up to limit profiles) of followed profiles online now, most recently active first."""
+        following_user_pkids = self.following.values_list("user_id", flat=True)
+        online_user_pkids = PresenceService.get_online(following_user_pkids)
+        if not online_user_pkids:
+            return 0, []
+
+        shown_user_pkids = online_user_pkids[:limit]
+        profiles = self.following.filter(user_id__in=shown_user_pkids).select_related(
+            "user"
+        )
+        position = {pkid: i for i, pkid in enumerate(shown_user_pkids)}
+        return len(online_user_pkids), sorted(
+            profiles, key=lambda profile: position[profile.user_id]
+        )
+
 
 class Profile(TimestampedModel, FollowMixin):
     """User's Profile model."""
@@ -41,6 +68,7 @@ class Profile(TimestampedModel, FollowMixin):
     profile_picture = models.ImageField(
         upload_to=generate_file_path, null=True, blank=True, default="defaults/zen.png"
     )
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
 
     phonenumber = PhoneNumberField(blank=True)
     birth_date = models.DateField(null=True, blank=True)
@@ -55,20 +83,61 @@ class Profile(TimestampedModel, FollowMixin):
         "self", symmetrical=False, related_name="following", blank=True
     )
 
+    # Fields shown on post cards of the profile's posts and comments
+    POST_CARD_FIELDS = ("username", "profile_picture", "profile_picture_variants")
+
     def __str__(self) -> str:
         """Return string Profile of the user: <user-email>."""
         return f"Profile of the user: {self.user.email}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Profile":
+        """Keep the loaded post card fields to tell if a save changed them."""
+        instance = super().from_db(db, field_names, values)
+        instance.saved_post_card_state = instance.get_post_card_state()
+        return instance
+
+    def get_post_card_state(self):
+        """Return the loaded post card fields, the picture by its file name."""
+        state = {
+            name: self.__dict__[name]
+            for name in self.POST_CARD_FIELDS
+            if name in self.__dict__
+        }
+        if "profile_picture" in state:
+            state["profile_picture"] = getattr(
+                state["profile_picture"], "name", state["profile_picture"]
+            )
+        return state
+
+    def has_post_card_changes(self, update_fields=None):
+        """Check if the save being done changes post card fields."""
+        if update_fields is not None:
+            return not set(update_fields).isdisjoint(self.POST_CARD_FIELDS)
+        return self.get_post_card_state() != getattr(
+            self, "saved_post_card_state", None
+        )
+
+    def get_replaced_picture(self):
+        """Return (file name, variants) of the previous picture if the save being done replaces it."""
+        saved_state = getattr(self, "saved_post_card_state", {})
+        if "profile_picture" not in saved_state:
+            return None
+
+        saved_picture = saved_state["profile_picture"]
+        if saved_picture == self.get_post_card_state().get("profile_picture"):
+            return None
+        return saved_picture, saved_state.get("profile_picture_variants") or {}
+
     def save(self, *args, **kwargs):
         """Save user's email as username as default."""
         if not self.username:
             self.username = self.user.email
-        return super().save(*args, **kwargs)
+        result = super().save(*args, **kwargs)
 
-    @property
-    def albums_count(self):
-        """Return profile's albums count."""
-        return self.albums.count()
+        # Save signals compare against the previous state, so it's kept until now
+        self.saved_post_card_state = self.get_post_card_state()
+        return result
 
     @property
     def special_eggs(self):
@@ -85,22 +154,27 @@ class Profile(TimestampedModel, FollowMixin):
         """Return user's easter eggs."""
         return Egg.objects.filter(egg_type="easter", user=self.user)
 
+    @cached_property
+    def egg_inventory(self):
+        """Return user's egg inventory, an empty one if no egg is collected yet."""
+        try:
+            return EggInventory.objects.get(user_id=self.user_id)
+        except EggInventory.DoesNotExist:
+            return EggInventory(user_id=self.user_id)
+
     def get_eggs_qunt(self):
         """Get all 3 types of eggs quantity of the profile."""
+        inventory = self.egg_inventory
         return {
-            "regular_eggs_count": sum(egg.quantity for egg in self.regular_eggs),
-            "special_eggs_count": sum(egg.quantity for egg in self.special_eggs),
-            "easter_eggs_count": sum(egg.quantity for egg in self.easter_eggs),
+            "regular_eggs_count": inventory.regular_quantity,
+            "special_eggs_count": inventory.special_quantity,
+            "easter_eggs_count": inventory.easter_quantity,
         }
 
     @property
     def total_eggs_count(self):
         """Return total eggs type count."""
-        return (
-            self.easter_eggs.count()
-            + self.special_eggs.count()
-            + self.regular_eggs.count()
-        )
+        return self.egg_inventory.total_count
 
     @property
     def posts(self):
@@ -109,8 +183,14 @@ class Profile(TimestampedModel, FollowMixin):
 
     @property
     def activity(self):
-        """Return user's actiity status."""
-        return ActivityManagerService.get_activity_obj(user=self.user)
+        """Return user's actiity status, attached in batch by list views or fetched on access."""
+        if not hasattr(self, "_activity"):
+            self._activity = ActivityManagerService.get_activity_obj(user=self.user)
+        return self._activity
+
+    @activity.setter
+    def activity(self, value):
+        self._activity = value
 
 
 class SpecialEggChoices(models.TextChoices):
@@ -175,6 +255,13 @@ class Egg(TimestampedModel):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="eggs"
     )
 
+    class Meta(TimestampedModel.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "url"], name="unique_egg_url_per_user"
+            )
+        ]
+
     def save(self, *args, **kwargs):
         """Override to also save egg url."""
         from network.posts.services import EggManageService
@@ -186,3 +273,31 @@ class Egg(TimestampedModel):
     def __str__(self) -> str:
         """Return egg info."""
         return f"{self.egg_type} egg: {self.name}"
+
+
+class EggInventory(TimestampedModel):
+    """
+    Per-user egg stats.
+
+    Holds the distinct eggs count and collected quantity of each egg type, kept
+    up to date by EggManageService, so egg stats cost one row read.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="egg_inventory"
+    )
+    special_count = models.PositiveIntegerField(default=0)
+    special_quantity = models.PositiveIntegerField(default=0)
+    regular_count = models.PositiveIntegerField(default=0)
+    regular_quantity = models.PositiveIntegerField(default=0)
+    easter_count = models.PositiveIntegerField(default=0)
+    easter_quantity = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        """Return egg inventory info."""
+        return f"Egg inventory of user: {self.user_id}"
+
+    @property
+    def total_count(self):
+        """Return distinct eggs count of all types."""
+        return self.special_count + self.regular_count + self.easter_count
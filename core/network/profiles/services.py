@@ -1,5 +1,9 @@
 """Activity Reader."""
 
+import math
+import time
+from itertools import chain
+
 from django.core.cache import cache
 from django.utils.timezone import now
 
@@ -26,6 +30,24 @@ class ActivityStatus:
     HIDING = "hiding_in_shell"
 
 
+# Count an active request with a sliding expiry, refresh last request time,
+# and move the user up the presence index, trimming users gone for too long
+RECORD_REQUEST_LUA = """
+if ARGV[1] == '1' then
+    redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[3], ARGV[2], ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', ARGV[2] - ARGV[5])
+"""
+
+MAX_TRACKED_WRITES = 10_000
+
+# {user_id: monotonic time}, last request time writes of this process
+_last_written = {}
+
+
 def cache_key(user_id, suffix):
     """Cache key using user id and specified string."""
     return f"user:{user_id}:{suffix}"
@@ -69,11 +91,9 @@ class ActivityManagerService:
     }
 
     @staticmethod
-    def update_activity_state(user_id, is_active_request):
+    def update_activity_state(user_id, user_pkid, is_active_request):
         """Update user activity counters & timestamps based on request type."""
-        if is_active_request:
-            ActvitiyWriterService.increment_active_count(user_id)
-        ActvitiyWriterService.update_last_request_timeout(user_id)
+        ActvitiyWriterService.record_request(user_id, user_pkid, is_active_request)
 
     @staticmethod
     def get_current_activity_status(user):
@@ -84,9 +104,25 @@ class ActivityManagerService:
     def get_activity_obj(user):
         """Return activity object."""
         status = ActivityReaderService.evaluate_activity_status(user)
-        if status in ActivityManagerService.ACTIVITY_OBJECT:
-            return ActivityManagerService.ACTIVITY_OBJECT[status]
-        return None
+        return ActivityManagerService.ACTIVITY_OBJECT.get(status)
+
+    @staticmethod
+    def get_activity_objs(users):
+        """Return {user id: activity object} of the users in one cache round trip."""
+        statuses = ActivityReaderService.evaluate_activity_statuses(users)
+        return {
+            user_id: ActivityManagerService.ACTIVITY_OBJECT.get(status)
+            for user_id, status in statuses.items()
+        }
+
+    @staticmethod
+    def attach_activity_objs(profiles):
+        """Attach activity objects to profiles, e.g. of a follow list page."""
+        activity_objs = ActivityManagerService.get_activity_objs(
+            [profile.user for profile in profiles]
+        )
+        for profile in profiles:
+            profile.activity = activity_objs[profile.user.id]
 
 
 class ActivityReaderService:
@@ -110,7 +146,32 @@ class ActivityReaderService:
         """Determine current activity status based on cached state."""
         active_count = ActivityReaderService.fetch_active_count(user.id)
         last_request = ActivityReaderService.fetch_last_request(user.id)
+        return ActivityReaderService.evaluate_status(user, active_count, last_request)
+
+    @staticmethod
+    def evaluate_activity_statuses(users):
+        """Return {user id: status} of the users, fetching their cached state at once."""
+        keys = {
+            user.id: (
+                cache_key(user.id, "active_count"),
+                cache_key(user.id, "last_request"),
+            )
+            for user in users
+        }
+        values = cache.get_many([key for pair in keys.values() for key in pair])
+
+        return {
+            user.id: ActivityReaderService.evaluate_status(
+                user,
+                active_count=int(values.get(keys[user.id][0]) or 0),
+                last_request=values.get(keys[user.id][1]),
+            )
+            for user in users
+        }
 
+    @staticmethod
+    def evaluate_status(user, active_count, last_request):
+        """Determine activity status from the user's fetched state."""
         if user.is_logged_out:
             return ActivityReaderService.evaluate_logout_status(user)
 
@@ -136,31 +197,88 @@ class ActvitiyWriterService:
     """Service to update user activity cached data and timeout."""
 
     TIMEOUT_SECONDS = 30  # 30 seconds sliding window for active tracking
+    REFRESH_SECONDS = 10  # non-active requests within this of the last write skip it
 
     @staticmethod
-    def increment_active_count(user_id):
-        """Increment active request count and reset TTL."""
-        key = cache_key(user_id, "active_count")
-        try:
-            cache.incr(key)
-        except ValueError:
-            cache.set(key, 1)
-        ActvitiyWriterService.expire_key(key)
+    def record_request(user_id, user_pkid, is_active_request):
+        """
+        Count an active request and refresh last request time in one round trip.
 
-    @staticmethod
-    def expire_key(key):
-        """Set expiry for a Redis key."""
-        real_key = cache.make_key(key)
-        cache.client.get_client().expire(
-            real_key,
-            ActvitiyWriterService.TIMEOUT_SECONDS,
+        The user's last activity time also goes to PresenceService's index.
+
+        Non-active requests are skipped while this process wrote the user's
+        last request time less than REFRESH_SECONDS ago.
+        """
+        current_time = time.monotonic()
+        if (
+            not is_active_request
+            and current_time - _last_written.get(user_id, -math.inf)
+            < ActvitiyWriterService.REFRESH_SECONDS
+        ):
+            return
+
+        if len(_last_written) >= MAX_TRACKED_WRITES:
+            _last_written.clear()
+        _last_written[user_id] = current_time
+
+        script = cache.client.get_client().register_script(RECORD_REQUEST_LUA)
+        script(
+            keys=[
+                cache.make_key(cache_key(user_id, "active_count")),
+                cache.make_key(cache_key(user_id, "last_request")),
+                PresenceService.KEY,
+            ],
+            args=[
+                int(is_active_request),
+                int(now().timestamp()),  # stored raw so cache.get reads an int
+                ActvitiyWriterService.TIMEOUT_SECONDS,
+                user_pkid,
+                PresenceService.RETENTION_SECONDS,
+            ],
         )
 
+
+class PresenceService:
+    """
+    Service for the presence index of users.
+
+    One sorted set of user pkids scored by last activity time, written by
+    ActvitiyWriterService, so the online users among many can be found in one
+    call instead of probing each user's activity keys.
+    """
+
+    KEY = "presence:users"
+    ONLINE_SECONDS = ActvitiyWriterService.TIMEOUT_SECONDS
+    RETENTION_SECONDS = 60 * 60 * 24  # users inactive for longer are trimmed
+    LOOKUP_BATCH_SIZE = 1000  # user pkids per ZMSCORE
+
+    @staticmethod
+    def get_last_seen(user_pkids):
+        """Return {user pkid: last activity timestamp} of users in the index."""
+        user_pkids = list(user_pkids)
+        if not user_pkids:
+            return {}
+
+        # Pipeline bounded ZMSCOREs so any number of users takes one round trip
+        batch_size = PresenceService.LOOKUP_BATCH_SIZE
+        pipe = cache.client.get_client().pipeline(transaction=False)
+        for start in range(0, len(user_pkids), batch_size):
+            pipe.zmscore(PresenceService.KEY, user_pkids[start : start + batch_size])
+        scores = chain.from_iterable(pipe.execute())
+
+        return {
+            pkid: score
+            for pkid, score in zip(user_pkids, scores, strict=True)
+            if score is not None
+        }
+
     @staticmethod
-    def update_last_request_timeout(user_id):
-        """Update last request timestamp."""
-        cache.set(
-            cache_key(user_id, "last_request"),
-            now().isoformat(),
-            timeout=ActvitiyWriterService.TIMEOUT_SECONDS,
+    def get_online(user_pkids):
+        """Return pkids of the users active within ONLINE_SECONDS, most recent first."""
+        online_since = now().timestamp() - PresenceService.ONLINE_SECONDS
+        last_seen = PresenceService.get_last_seen(user_pkids)
+        return sorted(
+            (pkid for pkid, score in last_seen.items() if score >= online_since),
+            key=last_seen.get,
+            reverse=True,
         )
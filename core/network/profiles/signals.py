@@ -7,7 +7,13 @@ from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
 from network.albums.models import Album, AlbumMedia
+from network.common.services import MediaVariantService
 from network.posts.models import Post, PostMedia
+from network.posts.services import (
+    EggManageService,
+    PostCardCacheService,
+    TurboySnapshotService,
+)
 from network.profiles.models import Profile
 
 from .models import Egg
@@ -16,15 +22,9 @@ logger = logging.getLogger(__name__)
 
 
 @receiver([post_save, post_delete], sender=Post)
-def invalidate_profile_posts_cache(sender, instance, created=None, **kwargs):
+def invalidate_profile_posts_stats(sender, instance, created=None, **kwargs):
     logger.info("Post is changing...")
-    user = instance.user
-    pages = get_page_num(user.posts.all())
-    username = user.profile.username
-
-    for page_num in range(1, pages + 1):
-        key = make_template_fragment_key("profile_posts", [username, page_num])
-        cache.delete(key)
+    username = instance.user.profile.username
 
     signal = kwargs.get("signal")
     if (signal == post_save and created) or signal == post_delete:
@@ -40,6 +40,13 @@ def invalidate_profile_nest_cache(sender, instance, **kwargs):
     cache.delete(key)
 
     invalidate_profile_stats(username)  # egg count changed, invalidate the cache
+    TurboySnapshotService.invalidate([instance.user.profile.pkid])
+
+
+@receiver([post_delete], sender=Egg)
+def rebuild_egg_inventory(sender, instance, **kwargs):
+    # Eggs are only deleted outside EggManageService, e.g. from admin
+    EggManageService.rebuild_inventory(instance.user_id)
 
 
 @receiver([post_save, post_delete], sender=PostMedia)
@@ -54,14 +61,8 @@ def invalidate_profile_media_cache(sender, instance, **kwargs):
 
 @receiver([post_save, post_delete], sender=Album)
 def invalidate_profile_album_cache(sender, instance, created=None, **kwargs):
-    profile = instance.profile
-    username = profile.username
-    pages = get_page_num(instances=profile.albums.all())
-    for page_num in range(1, pages + 1):
-        albums_paginator_key = make_template_fragment_key(
-            "profile_albums_paginator", [username, page_num]
-        )
-        cache.delete(albums_paginator_key)
+    username = instance.profile.username
+    invalidate_profile_albums_paginator(instance.profile)
 
     signal = kwargs.get("signal")
 
@@ -81,6 +82,9 @@ def invalidate_album_media_cache(sender, instance, **kwargs):
         key = make_template_fragment_key("album_media_paginator", [album_id, page_num])
         cache.delete(key)
 
+    # Album cards show their cover media
+    invalidate_profile_albums_paginator(album.profile)
+
 
 @receiver([m2m_changed], sender=Profile.following.through)
 def invalidate_followers_paginator_cache(
@@ -122,12 +126,55 @@ def invalidate_followers_paginator_cache(
         invalidate_profile_stats(following_changed_profile.username)
 
 
+@receiver([m2m_changed], sender=Profile.following.through)
+def invalidate_turboy_snapshot(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    # Turboy shows followers, which changed for the followed profiles
+    if reverse:
+        TurboySnapshotService.invalidate([instance.pk])
+    elif pk_set:
+        TurboySnapshotService.invalidate(pk_set)
+
+
 @receiver([post_save], sender=Profile)
 def invalidate_profile_info_cache(sender, instance, **kwargs):
     username = instance.username
     key = make_template_fragment_key("profile_info", [username])
     cache.delete(key)
 
+    # Post cards show the username and picture of the post and comment authors
+    if instance.has_post_card_changes(kwargs.get("update_fields")):
+        PostCardCacheService.bump_author_versions(instance.user)
+
+
+@receiver([post_delete], sender=PostMedia)
+@receiver([post_delete], sender=AlbumMedia)
+def delete_media_variants(sender, instance, **kwargs):
+    MediaVariantService.delete_variants(instance.variants, instance.file.name)
+
+
+@receiver([post_save], sender=Profile)
+def delete_replaced_picture_variants(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "profile_picture" not in update_fields:
+        return
+
+    replaced_picture = instance.get_replaced_picture()
+    if replaced_picture:
+        picture_name, variants = replaced_picture
+        MediaVariantService.delete_variants(variants, picture_name)
+
+
+def invalidate_profile_albums_paginator(profile):
+    username = profile.username
+    pages = get_page_num(instances=profile.albums.all())
+    for page_num in range(1, pages + 1):
+        albums_paginator_key = make_template_fragment_key(
+            "profile_albums_paginator", [username, page_num]
+        )
+        cache.delete(albums_paginator_key)
+
 
 def invalidate_profile_stats(username):
     key = make_template_fragment_key("profile_stats", [username])
@@ -4,16 +4,21 @@ import random
 
 from django import template
 
+from network.profiles.loaders import get_albums_count_loader, get_followed_loader
+
 register = template.Library()
 
 
 @register.filter
-def has_followed(profile, user):
-    """Check if the user has followed the profile."""
-    if not user.is_authenticated:
-        return False
-    user_profile = user.profile
-    return user_profile.has_followed(profile)
+def has_followed(profile, request):
+    """Check if the requesting user has followed the profile, batched per request."""
+    return get_followed_loader(request).load(profile.pkid)
+
+
+@register.filter
+def albums_count(profile, request):
+    """Return the profile's albums count, batched per request."""
+    return get_albums_count_loader(request).load(profile.pkid)
 
 
 @register.filter
@@ -2,7 +2,6 @@
 """Profile views."""
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse_lazy
 from django.views.generic import (
@@ -12,13 +11,17 @@ from django.views.generic import (
     View,
 )
 
-from network.common.mixins import SetHtmxAlertTriggerMixin
+from network.common.mixins import CursorPaginationMixin, SetHtmxAlertTriggerMixin
+from network.common.services import MediaVariantService
+from network.posts.feeds import TimelineService
 from network.posts.models import Post, PostMedia
-from network.posts.services import IncubationService
+from network.posts.services import IncubationService, PostCardCacheService
 
 from .constants import PHOTO_TABS, PROFILE_TABS
 from .forms import ProfileForm
+from .loaders import get_albums_count_loader, get_followed_loader
 from .models import Profile
+from .services import ActivityManagerService
 
 
 # Photo uploads view
@@ -61,6 +64,10 @@ class ProfileTabsBaseMixin:
             IncubationService.get_incubating_post_id(self.profile.user.id)
         )
 
+        # Follow button and stats of the profile resolve from batch loaders
+        get_followed_loader(self.request).register([self.profile.pkid])
+        get_albums_count_loader(self.request).register([self.profile.pkid])
+
         return context
 
 
@@ -96,6 +103,7 @@ class PhotosView(
 class PhotosUploadsView(
     PhotoTabsBaseMixin,
     ProfileTabsBaseMixin,
+    CursorPaginationMixin,
     ListView,
 ):
     """Photo uploads tab view."""
@@ -123,7 +131,7 @@ class PhotosAlbumsView(
     current_photo_tab = "albums"
 
 
-class PostsView(ProfileTabsBaseMixin, ListView):
+class PostsView(ProfileTabsBaseMixin, CursorPaginationMixin, ListView):
     """Profile Posts view that handles partial and full request."""
 
     current_tab = "turties"
@@ -133,8 +141,19 @@ class PostsView(ProfileTabsBaseMixin, ListView):
     def get_queryset(self):
         """Get prefetched post queryset by the profile user."""
         profile_user = self.profile.user
-        requesting_user = self.request.user
-        return Post.objects.published(requesting_user).by_user(user=profile_user)
+        return Post.objects.published().by_user(user=profile_user)
+
+    def get_context_data(self, **kwargs):
+        """Attach like data and fetch cached post cards of the page at once."""
+        context = super().get_context_data(**kwargs)
+        Post.objects.attach_list_data(context["posts"], self.request.user)
+        PostCardCacheService.prefetch(
+            context["posts"],
+            variant=PostCardCacheService.get_variant(
+                self.request.user.is_authenticated
+            ),
+        )
+        return context
 
 
 class NestView(ProfileTabsBaseMixin, TemplateView):
@@ -180,7 +199,7 @@ class FollowTabView(LoginRequiredMixin, ProfileTabsBaseMixin, TemplateView):
     current_tab = "follow"
 
 
-class FollowPaginatorBaseView(ListView):
+class FollowPaginatorBaseView(CursorPaginationMixin, ListView):
     """Follow Paginator Base View."""
 
     paginate_by = 10
@@ -199,9 +218,7 @@ class FollowPaginatorBaseView(ListView):
 
         # Follower/following profile need user id to retrieve activity data
         if self.follow_type == "followers":
-            return profile.followers.select_related("user").annotate(
-                mutual_followed=Exists(profile.following.filter(pk=OuterRef("pk")))
-            )
+            return profile.followers.select_related("user")
 
         return profile.following.select_related("user")
 
@@ -210,6 +227,12 @@ class FollowPaginatorBaseView(ListView):
         context = super().get_context_data(**kwargs)
         context["username"] = self.kwargs.get("username")
 
+        # Fetch activity and follow state of the page's profiles at once
+        ActivityManagerService.attach_activity_objs(context["object_list"])
+        get_followed_loader(self.request).register(
+            [profile.pkid for profile in context["object_list"]]
+        )
+
         return context
 
 
@@ -238,10 +261,14 @@ class FollowView(SetHtmxAlertTriggerMixin, View):
 
         if not has_followed:
             profile.follow(to_profile)
+            TimelineService.add_author_posts(user=request.user, author=to_profile.user)
             message = f"You followed {to_profile.username}!"
 
         else:
             profile.unfollow(to_profile)
+            TimelineService.remove_author_posts(
+                user=request.user, author=to_profile.user
+            )
             message = f"Unfollowed {to_profile.username}."
 
         resp = render(
@@ -268,6 +295,15 @@ class ProfileEditView(LoginRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         """Inject exited success to true when the edit is successful."""
+        picture_changed = "profile_picture" in form.changed_data
+        if picture_changed:
+            # Variants of the previous picture must not be served anymore
+            form.instance.profile_picture_variants = {}
         super().form_valid(form)
+
+        if picture_changed and self.object.profile_picture:
+            MediaVariantService.schedule(
+                [self.object], "profile_picture", "profile_picture_variants"
+            )
         context = {"profile_updated": True, "form": form}
         return render(self.request, self.template_name, context)
@@ -1,9 +1,15 @@
 """Tools for processing image."""
 
 from functools import partial
+from io import BytesIO
 from pathlib import Path
 from uuid import uuid4
 
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from network.common.constants import MEDIA_VARIANT_QUALITY, MEDIA_VARIANT_WIDTHS
+
 
 def generate_file_path(instance, filename, path_prefix="uploads"):  # noqa: ARG001
     """
@@ -18,3 +24,32 @@ def generate_file_path(instance, filename, path_prefix="uploads"):  # noqa: ARG0
 
 
 post_media_path = partial(generate_file_path, path_prefix="posts")
+
+
+def generate_webp_variants(file, widths=MEDIA_VARIANT_WIDTHS):
+    """
+    Save WebP copies of an image file, one per width narrower than the image.
+
+    Return {width: file name} of the copies and the original itself, for
+    example: {"320": "posts/UUID4_320w.webp", "1600": "posts/UUID4.jpg"}.
+    Animated images are returned as the original only.
+    """
+    with file.open("rb"), Image.open(file) as original:
+        if getattr(original, "is_animated", False):
+            return {str(original.width): file.name}
+
+        image = ImageOps.exif_transpose(original)
+        variants = {str(image.width): file.name}
+        stem = Path(file.name).with_suffix("")
+        for width in widths:
+            if width >= image.width:
+                break
+            height = round(image.height * width / image.width)
+            buffer = BytesIO()
+            image.resize((width, height), Image.Resampling.LANCZOS).save(
+                buffer, "WEBP", quality=MEDIA_VARIANT_QUALITY
+            )
+            variants[str(width)] = file.storage.save(
+                f"{stem}_{width}w.webp", ContentFile(buffer.getvalue())
+            )
+    return variants
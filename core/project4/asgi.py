@@ -9,8 +9,25 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from project4.wsgi import application as wsgi_application
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project4.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Keep serving static and media files, with ranges for video streams, by the
+# same WSGI stack as wsgi.py, everything else goes through Django's ASGI handler.
+files_application = WsgiToAsgi(wsgi_application)
+
+
+async def application(scope, receive, send):
+    """Route static and media requests to the WSGI file servers, others to Django."""
+    if scope["type"] == "http" and scope["path"].startswith(
+        (settings.STATIC_URL, settings.MEDIA_URL)
+    ):
+        return await files_application(scope, receive, send)
+    return await django_application(scope, receive, send)
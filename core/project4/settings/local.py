@@ -24,6 +24,20 @@ CACHES = {
 CELERY_BROKER_URL = "redis://redis:6379/0"
 # TODO figure out why this is set to None
 CELERY_RESULT_BACKEND = None
+CELERY_BEAT_SCHEDULE = {
+    "publish-due-posts": {
+        "task": "network.posts.tasks.publish_due_posts",
+        "schedule": 5,  # every 5 seconds
+    },
+    "reconcile-comment-counts": {
+        "task": "network.posts.tasks.reconcile_comment_counts",
+        "schedule": 60 * 60,  # hourly
+    },
+    "rank-trending-posts": {
+        "task": "network.posts.tasks.rank_trending_posts",
+        "schedule": 60,  # every minute
+    },
+}
 
 # CaccheOPs
 CACHEOPS_REDIS = "redis://redis:6379/1"